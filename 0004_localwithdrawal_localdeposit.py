@@ -1,60 +1,60 @@
-# Generated by Django 4.2.27 on 2026-01-28 18:43
-
-from decimal import Decimal
-from django.conf import settings
-from django.db import migrations, models
-import django.db.models.deletion
-
-
-class Migration(migrations.Migration):
-
-    dependencies = [
-        ('crypto', '0003_remove_profile_last_daily_reward_at_and_more'),
-    ]
-
-    operations = [
-        migrations.CreateModel(
-            name='LocalWithdrawal',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('amount_usdt', models.DecimalField(decimal_places=2, max_digits=18)),
-                ('conversion_rate', models.DecimalField(decimal_places=2, default=Decimal('1600'), max_digits=10)),
-                ('amount_ngn', models.DecimalField(decimal_places=2, max_digits=18)),
-                ('bank_name', models.CharField(max_length=100)),
-                ('account_number', models.CharField(max_length=20)),
-                ('account_holder_name', models.CharField(max_length=100)),
-                ('status', models.CharField(choices=[('pending_admin_approval', 'Pending Admin Approval'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('completed', 'Completed'), ('failed', 'Failed'), ('refunded', 'Refunded')], default='pending_admin_approval', max_length=30)),
-                ('paystack_transfer_reference', models.CharField(blank=True, max_length=100, null=True)),
-                ('paystack_response', models.JSONField(blank=True, null=True)),
-                ('admin_notes', models.TextField(blank=True, null=True)),
-                ('created_at', models.DateTimeField(auto_now_add=True)),
-                ('processed_at', models.DateTimeField(blank=True, null=True)),
-                ('processed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='processed_withdrawals', to=settings.AUTH_USER_MODEL)),
-                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='local_withdrawals', to=settings.AUTH_USER_MODEL)),
-            ],
-            options={
-                'ordering': ['-created_at'],
-            },
-        ),
-        migrations.CreateModel(
-            name='LocalDeposit',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('amount_usdt', models.DecimalField(decimal_places=2, max_digits=18)),
-                ('amount_ngn', models.DecimalField(decimal_places=2, max_digits=18)),
-                ('conversion_rate', models.DecimalField(decimal_places=2, default=Decimal('1600'), max_digits=10)),
-                ('paystack_reference', models.CharField(max_length=100, unique=True)),
-                ('paystack_access_code', models.CharField(blank=True, max_length=100, null=True)),
-                ('paystack_response', models.JSONField(blank=True, null=True)),
-                ('status', models.CharField(choices=[('pending', 'Pending Payment'), ('paid', 'Paid'), ('confirmed', 'Confirmed'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], default='pending', max_length=20)),
-                ('admin_notes', models.TextField(blank=True, null=True)),
-                ('created_at', models.DateTimeField(auto_now_add=True)),
-                ('confirmed_at', models.DateTimeField(blank=True, null=True)),
-                ('confirmed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='confirmed_deposits', to=settings.AUTH_USER_MODEL)),
-                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='local_deposits', to=settings.AUTH_USER_MODEL)),
-            ],
-            options={
-                'ordering': ['-created_at'],
-            },
-        ),
-    ]
+# Generated by Django 4.2.27 on 2026-01-28 18:43
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crypto', '0003_remove_profile_last_daily_reward_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocalWithdrawal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount_usdt', models.DecimalField(decimal_places=2, max_digits=18)),
+                ('conversion_rate', models.DecimalField(decimal_places=2, default=Decimal('1600'), max_digits=10)),
+                ('amount_ngn', models.DecimalField(decimal_places=2, max_digits=18)),
+                ('bank_name', models.CharField(max_length=100)),
+                ('account_number', models.CharField(max_length=20)),
+                ('account_holder_name', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('pending_admin_approval', 'Pending Admin Approval'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('completed', 'Completed'), ('failed', 'Failed'), ('refunded', 'Refunded')], default='pending_admin_approval', max_length=30)),
+                ('paystack_transfer_reference', models.CharField(blank=True, max_length=100, null=True)),
+                ('paystack_response', models.JSONField(blank=True, null=True)),
+                ('admin_notes', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('processed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='processed_withdrawals', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='local_withdrawals', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LocalDeposit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount_usdt', models.DecimalField(decimal_places=2, max_digits=18)),
+                ('amount_ngn', models.DecimalField(decimal_places=2, max_digits=18)),
+                ('conversion_rate', models.DecimalField(decimal_places=2, default=Decimal('1600'), max_digits=10)),
+                ('paystack_reference', models.CharField(max_length=100, unique=True)),
+                ('paystack_access_code', models.CharField(blank=True, max_length=100, null=True)),
+                ('paystack_response', models.JSONField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending Payment'), ('paid', 'Paid'), ('confirmed', 'Confirmed'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], default='pending', max_length=20)),
+                ('admin_notes', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('confirmed_at', models.DateTimeField(blank=True, null=True)),
+                ('confirmed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='confirmed_deposits', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='local_deposits', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
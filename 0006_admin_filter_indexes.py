@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-15 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crypto', '0005_localdeposit_paid_at_localdeposit_referrer'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['role'], name='user_role_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['is_banned'], name='user_banned_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['is_flagged'], name='user_flagged_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deposit',
+            index=models.Index(fields=['status'], name='deposit_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deposit',
+            index=models.Index(fields=['network'], name='deposit_network_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='withdrawal',
+            index=models.Index(fields=['status'], name='withdrawal_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='withdrawal',
+            index=models.Index(fields=['network'], name='withdrawal_network_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='copytrade',
+            index=models.Index(fields=['status'], name='copytrade_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='copytrade',
+            index=models.Index(fields=['action'], name='copytrade_action_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='promocode',
+            index=models.Index(fields=['status'], name='promocode_status_idx'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 4.2.7 on 2026-10-15 10:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crypto', '0006_admin_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='deposit',
+            name='deposit_status_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='withdrawal',
+            name='withdrawal_status_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='copytrade',
+            name='copytrade_status_idx',
+        ),
+        migrations.AddIndex(
+            model_name='copytrade',
+            index=models.Index(fields=['user', '-created_at'], name='copytrade_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='copytrade',
+            index=models.Index(fields=['status', '-created_at'], name='copytrade_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyreward',
+            index=models.Index(fields=['user', '-claimed_at'], name='dailyreward_user_claimed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deposit',
+            index=models.Index(fields=['user', '-created_at'], name='deposit_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deposit',
+            index=models.Index(fields=['status', '-created_at'], name='deposit_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='localdeposit',
+            index=models.Index(fields=['user', '-created_at'], name='localdep_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='localdeposit',
+            index=models.Index(fields=['status', '-created_at'], name='localdep_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='localwithdrawal',
+            index=models.Index(fields=['user', '-created_at'], name='localwd_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='localwithdrawal',
+            index=models.Index(fields=['status', '-created_at'], name='localwd_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', '-created_at'], name='notif_user_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='promoredemption',
+            index=models.Index(fields=['user', '-created_at'], name='promoredeem_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='withdrawal',
+            index=models.Index(fields=['user', '-created_at'], name='withdrawal_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='withdrawal',
+            index=models.Index(fields=['status', '-created_at'], name='withdrawal_status_created_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-15 11:20
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_principal_balance(apps, schema_editor):
+    Profile = apps.get_model('crypto', 'Profile')
+    Profile.objects.update(principal_balance=F('locked_balance') + F('withdrawable_balance'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crypto', '0007_history_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='principal_balance',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=Decimal('0'), max_digits=18),
+        ),
+        migrations.RunPython(backfill_principal_balance, migrations.RunPython.noop),
+    ]
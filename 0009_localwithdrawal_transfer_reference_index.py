@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-15 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crypto', '0008_profile_principal_balance'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='localwithdrawal',
+            name='paystack_transfer_reference',
+            field=models.CharField(blank=True, db_index=True, max_length=100, null=True),
+        ),
+    ]
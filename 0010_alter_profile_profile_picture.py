@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-15 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crypto', '0009_localwithdrawal_transfer_reference_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='profile',
+            name='profile_picture',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-15 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crypto', '0010_alter_profile_profile_picture'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['last_login_ip'], name='user_last_login_ip_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['phone'], name='user_phone_idx'),
+        ),
+    ]
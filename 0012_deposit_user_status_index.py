@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-15 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crypto', '0011_customuser_ip_phone_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deposit',
+            index=models.Index(fields=['user', 'status', '-created_at'], name='deposit_user_status_idx'),
+        ),
+    ]
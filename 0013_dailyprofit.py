@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-15 15:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crypto', '0012_deposit_user_status_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyProfit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=18)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_profits', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailyprofit',
+            constraint=models.UniqueConstraint(fields=('user', 'date'), name='dailyprofit_user_date_uniq'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.7 on 2026-10-15 16:40
+
+from collections import defaultdict
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def backfill_rollup(apps, schema_editor):
+    DailyFinanceRollup = apps.get_model('crypto', 'DailyFinanceRollup')
+    sources = (
+        ('crypto_deposits', apps.get_model('crypto', 'Deposit'), 'approved', 'amount', ('approved_at',)),
+        ('local_deposits', apps.get_model('crypto', 'LocalDeposit'), 'paid', 'amount_usdt', ('paid_at',)),
+        ('crypto_withdrawals', apps.get_model('crypto', 'Withdrawal'), 'approved', 'amount', ('processed_at',)),
+        ('local_withdrawals', apps.get_model('crypto', 'LocalWithdrawal'), 'completed', 'amount_usdt',
+         ('completed_at', 'processed_at')),
+    )
+    days = defaultdict(dict)
+    for column, model, status, amount, done_at in sources:
+        rows = (model.objects.filter(status=status)
+                .annotate(day=TruncDate(Coalesce(*done_at, 'created_at')))
+                .values('day').annotate(total=Sum(amount)).order_by())
+        for row in rows:
+            days[row['day']][column] = row['total']
+    DailyFinanceRollup.objects.bulk_create(
+        DailyFinanceRollup(day=day, **totals) for day, totals in days.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crypto', '0013_dailyprofit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='localwithdrawal',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='DailyFinanceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('crypto_deposits', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=18)),
+                ('local_deposits', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=18)),
+                ('crypto_withdrawals', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=18)),
+                ('local_withdrawals', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=18)),
+            ],
+            options={
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.RunPython(backfill_rollup, migrations.RunPython.noop),
+    ]
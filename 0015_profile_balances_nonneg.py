@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-15 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crypto', '0014_dailyfinancerollup'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='profile',
+            constraint=models.CheckConstraint(check=models.Q(('locked_balance__gte', 0), ('withdrawable_balance__gte', 0), ('principal_balance__gte', 0)), name='profile_balances_nonneg'),
+        ),
+    ]
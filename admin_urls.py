@@ -0,0 +1,28 @@
+# =============================================================================
+# crypto/admin_urls.py
+# Staff-only pages, mounted under admin/ by crypto/urls.py
+# =============================================================================
+
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('', views.admin_dashboard_view, name='admin_dashboard'),
+    path('deposits/', views.admin_deposits_view, name='admin_deposits'),
+    path('deposits/<int:pk>/approve/', views.admin_deposit_approve_view, name='admin_deposit_approve'),
+    path('deposits/<int:pk>/reject/', views.admin_deposit_reject_view, name='admin_deposit_reject'),
+    path('withdrawals/', views.admin_withdrawals_view, name='admin_withdrawals'),
+    path('withdrawals/<int:pk>/approve/', views.admin_withdrawal_approve_view, name='admin_withdrawal_approve'),
+    path('withdrawals/<int:pk>/reject/', views.admin_withdrawal_reject_view, name='admin_withdrawal_reject'),
+    path('local-withdrawals/', views.admin_local_withdrawals_view, name='admin_local_withdrawals'),
+    path('local-withdrawals/<int:pk>/approve/', views.admin_local_withdrawal_approve_view, name='admin_local_withdrawal_approve'),
+    path('local-withdrawals/<int:pk>/reject/', views.admin_local_withdrawal_reject_view, name='admin_local_withdrawal_reject'),
+    path('local-withdrawals/<int:pk>/complete/', views.admin_local_withdrawal_complete_view, name='admin_local_withdrawal_complete'),
+    path('promos/', views.admin_promos_view, name='admin_promos'),
+    path('promos/<int:pk>/toggle/', views.admin_promo_toggle_view, name='admin_promo_toggle'),
+    path('users/', views.admin_users_view, name='admin_users'),
+    path('users/<int:pk>/flag/', views.admin_user_flag_view, name='admin_user_flag'),
+    path('users/<int:pk>/unflag/', views.admin_user_unflag_view, name='admin_user_unflag'),
+    path('users/<int:pk>/ban/', views.admin_user_ban_view, name='admin_user_ban'),
+    path('users/<int:pk>/unban/', views.admin_user_unban_view, name='admin_user_unban'),
+]
@@ -1,7 +1,7 @@
-from django.apps import AppConfig
-
-
-class CryptoConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'crypto'
-    verbose_name = 'Crypto Copy Trade'
+from django.apps import AppConfig
+
+
+class CryptoConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'crypto'
+    verbose_name = 'Crypto Copy Trade'
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from crypto.tasks import detect_and_flag_multiple_accounts, store_detection_result
+
+
+class Command(BaseCommand):
+    help = "Flag accounts that share an IP, phone or signup burst"
+
+    def handle(self, *args, **options):
+        flagged_count = detect_and_flag_multiple_accounts()
+        store_detection_result(flagged_count)
+        self.stdout.write(f"Flagged {flagged_count} account(s).")
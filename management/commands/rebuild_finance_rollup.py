@@ -0,0 +1,14 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from crypto.models import ADMIN_DASHBOARD_KEY
+from crypto.tasks import rebuild_finance_rollup
+
+
+class Command(BaseCommand):
+    help = "Recompute the admin dashboard's daily deposit/withdrawal totals"
+
+    def handle(self, *args, **options):
+        day_count = rebuild_finance_rollup()
+        cache.delete(ADMIN_DASHBOARD_KEY)
+        self.stdout.write(f"Rebuilt {day_count} day(s).")
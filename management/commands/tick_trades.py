@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from crypto.tasks import TICK_INTERVAL, tick_trades
+
+
+class Command(BaseCommand):
+    help = "Update pending copy trades and expire matured deposits"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help=f"Keep running, one pass every {TICK_INTERVAL} seconds",
+        )
+
+    def handle(self, *args, **options):
+        tick_trades()
+        while options['loop']:
+            time.sleep(TICK_INTERVAL)
+            tick_trades()
@@ -1,350 +1,701 @@
-# =============================================================================
-# crypto/models.py
-# =============================================================================
-
-from django.db import models
-from django.contrib.auth.models import AbstractUser
-from decimal import Decimal
-from django.db import models
-from django.conf import settings
-
-class Rank(models.Model):
-    name = models.CharField(max_length=64)
-    min_balance = models.DecimalField(max_digits=18, decimal_places=2)
-    max_balance = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)  # None for unlimited
-    daily_profit_pct = models.DecimalField(max_digits=5, decimal_places=2)  # e.g., 1.67 for 1.67%
-    copy_trades_limit = models.IntegerField()
-    color = models.CharField(max_length=16)
-
-    class Meta:
-        ordering = ['min_balance']
-
-    def __str__(self):
-        return self.name
-    
-    @property
-    def daily_profit_percentage(self):
-        """Alias for backward compatibility"""
-        return self.daily_profit_pct
-    
-    @property
-    def max_copy_trades(self):
-        """Alias for backward compatibility"""
-        return self.copy_trades_limit
-
-
-class CustomUser(AbstractUser):
-    ROLE_CHOICES = [('user', 'User'), ('admin', 'Admin')]
-    role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='user')
-    is_banned = models.BooleanField(default=False)
-    is_flagged = models.BooleanField(default=False)
-    last_login_ip = models.GenericIPAddressField(null=True, blank=True)
-    phone = models.CharField(max_length=32, blank=True)
-
-    @property
-    def is_admin(self):
-        return self.role == 'admin'
-
-
-class Profile(models.Model):
-    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name='profile')
-    rank = models.ForeignKey(Rank, on_delete=models.SET_NULL, null=True, blank=True, related_name='profiles')
-    # Principal balance: user-deposited funds
-    locked_balance = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0'))
-    withdrawable_balance = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0'))
-    profile_picture = models.TextField(blank=True)  # Store image URL for now
-    referral_code = models.CharField(max_length=16, unique=True, null=True, blank=True)
-    total_referrals = models.IntegerField(default=0)
-    valid_referrals = models.IntegerField(default=0)
-    referral_earnings = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0'))
-    # last_daily_profit_at = models.DateTimeField(null=True, blank=True, default=None)  # Track daily profit generation
-    last_withdrawal_at = models.DateTimeField(null=True, blank=True)
-
-    @property
-    def principal_balance(self):
-        """Total active balance (principal) for rank calculation"""
-        return self.locked_balance + self.withdrawable_balance
-
-    @property
-    def total_balance(self):
-        """Alias for backward compatibility"""
-        return self.principal_balance
-
-    def get_rank(self):
-        """Calculate and return rank based on principal balance"""
-        if self.principal_balance <= 0:
-            return None
-        
-        ranks = Rank.objects.order_by('min_balance')
-        for rank in ranks:
-            if self.principal_balance >= rank.min_balance:
-                if rank.max_balance is None or self.principal_balance <= rank.max_balance:
-                    return rank
-        return None
-
-    def update_rank(self):
-        """Update rank based on current principal balance"""
-        new_rank = self.get_rank()
-        if new_rank != self.rank:
-            self.rank = new_rank
-            self.save(update_fields=['rank'])
-        return new_rank
-
-    def __str__(self):
-        return f"Profile({self.user.username})"
-
-
-class Deposit(models.Model):
-    STATUS_CHOICES = [('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('expired', 'Expired')]
-    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='deposits')
-    amount = models.DecimalField(max_digits=18, decimal_places=2)
-    network = models.CharField(max_length=32)
-    wallet_address = models.CharField(max_length=128, blank=True)
-    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='pending')
-    expires_at = models.DateTimeField(null=True, blank=True)
-    approved_at = models.DateTimeField(null=True, blank=True)
-    referrer = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='referred_deposits')
-    created_at = models.DateTimeField(auto_now_add=True)
-
-    class Meta:
-        ordering = ['-created_at']
-
-
-class Withdrawal(models.Model):
-    STATUS_CHOICES = [('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')]
-    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='withdrawals')
-    amount = models.DecimalField(max_digits=18, decimal_places=2)
-    network = models.CharField(max_length=32)
-    wallet_address = models.CharField(max_length=128, blank=True)
-    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='pending')
-    processed_at = models.DateTimeField(null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
-
-    class Meta:
-        ordering = ['-created_at']
-
-
-class CopyTrade(models.Model):
-    ACTION_CHOICES = [('buy', 'Buy'), ('sell', 'Sell')]
-    STATUS_CHOICES = [('pending', 'Pending'), ('completed', 'Completed'), ('cancelled', 'Cancelled')]
-    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='copy_trades')
-    pair = models.CharField(max_length=32)
-    action = models.CharField(max_length=4, choices=ACTION_CHOICES)
-    amount = models.DecimalField(max_digits=18, decimal_places=2)
-    profit = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0'))
-    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='pending')
-    created_at = models.DateTimeField(auto_now_add=True)
-
-    class Meta:
-        ordering = ['-created_at']
-
-
-class Referral(models.Model):
-    referrer = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='referrals_made')
-    referee = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='referrals_received')
-    bonus_amount = models.DecimalField(max_digits=18, decimal_places=2)
-    credited_to_locked = models.BooleanField(default=True)
-    deposit = models.ForeignKey(Deposit, on_delete=models.SET_NULL, null=True, blank=True, related_name='referral_bonuses')
-    created_at = models.DateTimeField(auto_now_add=True)
-
-
-class DailyReward(models.Model):
-    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='daily_rewards')
-    amount = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.10'))
-    claimed_at = models.DateTimeField(auto_now_add=True)
-    added_to_withdrawable = models.BooleanField(default=True)
-
-    class Meta:
-        ordering = ['-claimed_at']
-
-
-class PromoCode(models.Model):
-    STATUS_CHOICES = [('active', 'Active'), ('disabled', 'Disabled')]
-    code = models.CharField(max_length=32, unique=True)
-    bonus_min = models.DecimalField(max_digits=18, decimal_places=2)
-    bonus_max = models.DecimalField(max_digits=18, decimal_places=2)
-    expiration = models.DateTimeField(null=True, blank=True)
-    usage_limit = models.IntegerField(null=True, blank=True)
-    usage_count = models.IntegerField(default=0)
-    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='active')
-    created_at = models.DateTimeField(auto_now_add=True)
-
-    def __str__(self):
-        return self.code
-
-
-class PromoRedemption(models.Model):
-    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='promo_redemptions')
-    promo_code = models.ForeignKey(PromoCode, on_delete=models.CASCADE, related_name='redemptions')
-    bonus_amount = models.DecimalField(max_digits=18, decimal_places=2)
-    credited_to_locked = models.BooleanField(default=True)
-    created_at = models.DateTimeField(auto_now_add=True)
-
-    class Meta:
-        unique_together = ['user', 'promo_code']
-        ordering = ['-created_at']
-
-# class DailyProfit(models.Model):
-#     """Track daily profit generation for each user"""
-#     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='daily_profits')
-#     amount = models.DecimalField(max_digits=18, decimal_places=2)
-#     calculated_at = models.DateTimeField(auto_now_add=True)
-#     for_date = models.DateField()  # The date this profit is for
-#     locked_balance_used = models.DecimalField(max_digits=18, decimal_places=2)  # Balance used for calculation
-#     rank_used = models.ForeignKey(Rank, on_delete=models.SET_NULL, null=True)
-#     
-#     class Meta:
-#         unique_together = ['user', 'for_date']
-#         ordering = ['-for_date']
-
-
-class LocalWithdrawal(models.Model):
-    """Local withdrawal with Paystack integration"""
-    STATUS_CHOICES = [
-        ('pending_admin_approval', 'Pending Admin Approval'),
-        ('approved', 'Approved'),
-        ('rejected', 'Rejected'),
-        ('completed', 'Completed'),
-        ('failed', 'Failed'),
-        ('refunded', 'Refunded'),
-    ]
-    
-    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='local_withdrawals')
-    amount_usdt = models.DecimalField(max_digits=18, decimal_places=2)
-    conversion_rate = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('1600'))
-    amount_ngn = models.DecimalField(max_digits=18, decimal_places=2)
-    
-    # Bank details
-    bank_name = models.CharField(max_length=100)
-    account_number = models.CharField(max_length=20)
-    account_holder_name = models.CharField(max_length=100)
-    
-    def get_bank_code(self):
-        """Get Paystack bank code from bank name"""
-        bank_codes = {
-            'Access Bank': '044',
-            'Access Diamond': '044',
-            'ALAT by Wema': '035',
-            'ASO Savings': '401',
-            'Citibank': '023',
-            'Carbon': '565',
-            'Ecobank': '050',
-            'EcoBank': '050',
-            'Fidelity Bank': '070',
-            'First Bank': '011',
-            'First Bank of Nigeria': '011',
-            'First City Monument Bank': '214',
-            'FCMB': '214',
-            'FSDH Merchant': '501',
-            'Globus Bank': '103',
-            'Guaranty Trust Bank': '058',
-            'GTBank': '058',
-            'Heritage Bank': '030',
-            'Jaiz Bank': '301',
-            'Keystone Bank': '082',
-            'Kuda Bank': '50211',
-            'Moniepoint': '50215',
-            'Opay': '999992',
-            'Palmpay': '999991',
-            'Polaris Bank': '076',
-            'Providus Bank': '101',
-            'Stanbic IBTC': '221',
-            'Standard Chartered': '068',
-            'Sterling Bank': '232',
-            'Suntrust Bank': '100',
-            'Taj Bank': '302',
-            'Union Bank': '032',
-            'United Bank for Africa': '033',
-            'UBA': '033',
-            'Unity Bank': '215',
-            'Wema Bank': '035',
-            'Zenith Bank': '057',
-            'OPAY': '999992',
-        }
-        return bank_codes.get(self.bank_name, '999992')  # Default to OPAY if not found
-    
-    # Status and tracking
-    status = models.CharField(max_length=30, choices=STATUS_CHOICES, default='pending_admin_approval')
-    paystack_transfer_reference = models.CharField(max_length=100, null=True, blank=True)
-    paystack_response = models.JSONField(null=True, blank=True)
-    
-    # Admin actions
-    admin_notes = models.TextField(null=True, blank=True)
-    processed_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='processed_withdrawals')
-    
-    # Timestamps
-    created_at = models.DateTimeField(auto_now_add=True)
-    processed_at = models.DateTimeField(null=True, blank=True)
-    
-    class Meta:
-        ordering = ['-created_at']
-    
-    def __str__(self):
-        return f"Local Withdrawal {self.id} - {self.user.username} - ${self.amount_usdt}"
-    
-    def save(self, *args, **kwargs):
-        # Calculate NGN amount if not set
-        if not self.amount_ngn:
-            self.amount_ngn = self.amount_usdt * self.conversion_rate
-        super().save(*args, **kwargs)
-
-
-class LocalDeposit(models.Model):
-    """Local deposit with Paystack payment"""
-    STATUS_CHOICES = [
-        ('pending', 'Pending Payment'),
-        ('paid', 'Paid'),
-        ('confirmed', 'Confirmed'),
-        ('failed', 'Failed'),
-        ('cancelled', 'Cancelled'),
-    ]
-    
-    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='local_deposits')
-    amount_usdt = models.DecimalField(max_digits=18, decimal_places=2)
-    amount_ngn = models.DecimalField(max_digits=18, decimal_places=2)
-    conversion_rate = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('1600'))
-    
-    # Referral support
-    referrer = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='referred_local_deposits')
-    
-    # Paystack integration
-    paystack_reference = models.CharField(max_length=100, unique=True)
-    paystack_access_code = models.CharField(max_length=100, null=True, blank=True)
-    paystack_response = models.JSONField(null=True, blank=True)
-    
-    # Status
-    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
-    
-    # Admin confirmation
-    confirmed_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='confirmed_deposits')
-    admin_notes = models.TextField(null=True, blank=True)
-    
-    # Timestamps
-    created_at = models.DateTimeField(auto_now_add=True)
-    confirmed_at = models.DateTimeField(null=True, blank=True)
-    paid_at = models.DateTimeField(null=True, blank=True)
-    
-    class Meta:
-        ordering = ['-created_at']
-    
-    def __str__(self):
-        return f"Local Deposit {self.id} - {self.user.username} - ${self.amount_usdt}"
-    
-    def save(self, *args, **kwargs):
-        # Calculate NGN amount if not set
-        if not self.amount_ngn:
-            self.amount_ngn = self.amount_usdt * self.conversion_rate
-        super().save(*args, **kwargs)
-
-#     def __str__(self):
-#         return f"DailyProfit({self.user.username}, {self.for_date}, ${self.amount})"
-
-
-class Notification(models.Model):
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
-    message = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
-    is_read = models.BooleanField(default=False)
-
-    def __str__(self):
-        return f"Notification for {self.user.username}: {self.message[:20]}"
+# =============================================================================
+# crypto/models.py
+# =============================================================================
+
+from functools import cached_property, lru_cache
+from types import MappingProxyType
+
+from django.core.cache import cache
+from django.db import IntegrityError, models, transaction
+from django.contrib.auth.models import AbstractUser
+from django.db.models import Case, Count, F, Q, Value, When
+from django.db.models.lookups import GreaterThanOrEqual, LessThanOrEqual
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from decimal import Decimal
+from django.db import models
+from django.conf import settings
+from django.utils import timezone
+
+from .utils import generate_referral_code
+
+class Rank(models.Model):
+    name = models.CharField(max_length=64)
+    min_balance = models.DecimalField(max_digits=18, decimal_places=2)
+    max_balance = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)  # None for unlimited
+    daily_profit_pct = models.DecimalField(max_digits=5, decimal_places=2)  # e.g., 1.67 for 1.67%
+    copy_trades_limit = models.IntegerField()
+    color = models.CharField(max_length=16)
+
+    class Meta:
+        ordering = ['min_balance']
+
+    def __str__(self):
+        return self.name
+    
+    @property
+    def daily_profit_percentage(self):
+        """Alias for backward compatibility"""
+        return self.daily_profit_pct
+    
+    @property
+    def max_copy_trades(self):
+        """Alias for backward compatibility"""
+        return self.copy_trades_limit
+
+
+@lru_cache(maxsize=1)
+def ranks_by_min_balance():
+    """Rank ladder ordered by min_balance, cached per process until a Rank changes"""
+    return tuple(Rank.objects.order_by('min_balance'))
+
+
+@receiver(post_save, sender=Rank)
+@receiver(post_delete, sender=Rank)
+def _clear_rank_cache(sender, **kwargs):
+    ranks_by_min_balance.cache_clear()
+
+
+class CustomUser(AbstractUser):
+    ROLE_CHOICES = [('user', 'User'), ('admin', 'Admin')]
+    role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='user')
+    is_banned = models.BooleanField(default=False)
+    is_flagged = models.BooleanField(default=False)
+    last_login_ip = models.GenericIPAddressField(null=True, blank=True)
+    phone = models.CharField(max_length=32, blank=True)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['role'], name='user_role_idx'),
+            models.Index(fields=['is_banned'], name='user_banned_idx'),
+            models.Index(fields=['is_flagged'], name='user_flagged_idx'),
+            models.Index(fields=['last_login_ip'], name='user_last_login_ip_idx'),
+            models.Index(fields=['phone'], name='user_phone_idx'),
+        ]
+
+    @property
+    def is_admin(self):
+        return self.role == 'admin'
+
+    @cached_property
+    def has_admin_access(self):
+        """Superuser or admin role; computed once per user instance (i.e. per request)"""
+        return self.is_superuser or self.role == 'admin'
+
+
+class BulkInsertQuerySet(models.QuerySet):
+    def bulk_insert(self, rows, batch_size=1000):
+        """Create rows from field dicts using batched multi-row INSERTs"""
+        return self.bulk_create([self.model(**row) for row in rows], batch_size=batch_size)
+
+
+class LocalPaymentQuerySet(models.QuerySet):
+    def without_payload(self):
+        """Skip the Paystack JSON blob and admin notes that list pages never show"""
+        return self.defer('paystack_response', 'admin_notes')
+
+
+class ProfileQuerySet(models.QuerySet):
+    def with_relations(self):
+        """Join the user and rank rows that profile listings display"""
+        return self.select_related('user', 'rank')
+
+    def create_with_referral_code(self, user, attempts=5):
+        """Insert a profile with a fresh referral code; a collision costs one retry, not a pre-check"""
+        for _ in range(attempts - 1):
+            try:
+                with transaction.atomic():
+                    return self.create(user=user, referral_code=generate_referral_code())
+            except IntegrityError:
+                continue
+        return self.create(user=user, referral_code=generate_referral_code())
+
+    def credit_referral(self, bonus, valid=True):
+        """Add a referral bonus to the locked balance and bump the counters in one UPDATE"""
+        counters = {
+            'locked_balance': F('locked_balance') + bonus,
+            'principal_balance': F('principal_balance') + bonus,
+            'total_referrals': F('total_referrals') + 1,
+            'referral_earnings': F('referral_earnings') + bonus,
+        }
+        if valid:
+            counters['valid_referrals'] = F('valid_referrals') + 1
+        return self.update(**counters)
+
+    def adjust_balances(self, locked_delta=Decimal('0'), withdrawable_delta=Decimal('0')):
+        """Add the deltas to every profile in the queryset with one UPDATE, keeping principal in sync"""
+        return self.update(
+            locked_balance=F('locked_balance') + locked_delta,
+            withdrawable_balance=F('withdrawable_balance') + withdrawable_delta,
+            principal_balance=F('principal_balance') + locked_delta + withdrawable_delta,
+        )
+
+    def credit_withdrawable(self, amounts):
+        """Add per-user amounts ({user_id: amount}) to withdrawable balances in one UPDATE"""
+        if not amounts:
+            return 0
+        credit = Case(
+            *[When(user_id=user_id, then=Value(amount)) for user_id, amount in amounts.items()],
+            output_field=models.DecimalField(max_digits=18, decimal_places=2),
+        )
+        return self.filter(user_id__in=amounts).update(
+            withdrawable_balance=F('withdrawable_balance') + credit,
+            principal_balance=F('principal_balance') + credit,
+        )
+
+    def update_ranks(self):
+        """Recompute rank for every profile in the queryset with one UPDATE.
+
+        Mirrors ``Profile.get_rank``: the first band (by ``min_balance``) that
+        contains the principal balance wins, and a non-positive balance has
+        no rank.
+        """
+        principal = F('locked_balance') + F('withdrawable_balance')
+        whens = [When(LessThanOrEqual(principal, 0), then=Value(None))]
+        for rank in ranks_by_min_balance():
+            condition = GreaterThanOrEqual(principal, rank.min_balance)
+            if rank.max_balance is not None:
+                condition &= LessThanOrEqual(principal, rank.max_balance)
+            whens.append(When(condition, then=Value(rank.pk)))
+        return self.update(rank=Case(*whens, default=Value(None), output_field=models.BigIntegerField()))
+
+
+class Profile(models.Model):
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name='profile')
+    rank = models.ForeignKey(Rank, on_delete=models.SET_NULL, null=True, blank=True, related_name='profiles')
+    # Principal balance: user-deposited funds
+    locked_balance = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0'))
+    withdrawable_balance = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0'))
+    # Total active balance (locked + withdrawable), stored so rank/balance
+    # queries can filter and sort on it; kept in sync by save()/adjust_balances()
+    principal_balance = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0'), db_index=True)
+    profile_picture = models.CharField(max_length=255, blank=True)  # Path of the uploaded image under MEDIA_ROOT
+    referral_code = models.CharField(max_length=16, unique=True, null=True, blank=True)
+    total_referrals = models.IntegerField(default=0)
+    valid_referrals = models.IntegerField(default=0)
+    referral_earnings = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0'))
+    # last_daily_profit_at = models.DateTimeField(null=True, blank=True, default=None)  # Track daily profit generation
+    last_withdrawal_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ProfileQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # Last line of defence under the F() updates: an overdraft fails instead of going negative
+            models.CheckConstraint(
+                check=Q(locked_balance__gte=0) & Q(withdrawable_balance__gte=0) & Q(principal_balance__gte=0),
+                name='profile_balances_nonneg',
+            ),
+        ]
+
+    @property
+    def total_balance(self):
+        """Alias for backward compatibility"""
+        return self.principal_balance
+
+    def get_rank(self, ranks=None):
+        """Calculate and return rank based on principal balance.
+
+        ``ranks`` may be a pre-fetched list ordered by ``min_balance``;
+        by default the cached ladder from ``ranks_by_min_balance`` is used.
+        """
+        # Use the live fields, not the stored column, so unsaved balance
+        # changes are taken into account
+        balance = self.locked_balance + self.withdrawable_balance
+        if balance <= 0:
+            return None
+        
+        if ranks is None:
+            ranks = ranks_by_min_balance()
+        for rank in ranks:
+            if balance >= rank.min_balance:
+                if rank.max_balance is None or balance <= rank.max_balance:
+                    return rank
+        return None
+
+    def update_rank(self):
+        """Update rank based on current principal balance"""
+        new_rank = self.get_rank()
+        if self.rank_id != (new_rank.pk if new_rank else None):
+            self.rank = new_rank
+            self.save(update_fields=['rank'])
+        return new_rank
+
+    def sync_principal_balance(self):
+        """Recompute the stored principal balance from the two balances"""
+        self.principal_balance = self.locked_balance + self.withdrawable_balance
+
+    def adjust_balances(self, locked_delta=Decimal('0'), withdrawable_delta=Decimal('0')):
+        """Atomically add the deltas in the database and reload the balances"""
+        Profile.objects.filter(pk=self.pk).adjust_balances(locked_delta, withdrawable_delta)
+        self.refresh_from_db(fields=['locked_balance', 'withdrawable_balance', 'principal_balance'])
+
+    def debit_withdrawable(self, amount, **fields):
+        """Take amount from the withdrawable balance in one conditional UPDATE.
+
+        Extra ``fields`` are written in the same statement. Returns False,
+        changing nothing, when the balance in the database doesn't cover it.
+        """
+        updated = Profile.objects.filter(pk=self.pk, withdrawable_balance__gte=amount).update(
+            withdrawable_balance=F('withdrawable_balance') - amount,
+            principal_balance=F('principal_balance') - amount,
+            **fields,
+        )
+        if updated:
+            self.refresh_from_db(fields=['withdrawable_balance', 'principal_balance', *fields])
+        return bool(updated)
+
+    def save(self, *args, **kwargs):
+        self.sync_principal_balance()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'locked_balance', 'withdrawable_balance'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'principal_balance'}
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"Profile({self.user.username})"
+
+
+class Deposit(models.Model):
+    STATUS_CHOICES = [('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('expired', 'Expired')]
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='deposits')
+    amount = models.DecimalField(max_digits=18, decimal_places=2)
+    network = models.CharField(max_length=32)
+    wallet_address = models.CharField(max_length=128, blank=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='pending')
+    expires_at = models.DateTimeField(null=True, blank=True)
+    approved_at = models.DateTimeField(null=True, blank=True)
+    referrer = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='referred_deposits')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = BulkInsertQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='deposit_user_created_idx'),
+            models.Index(fields=['user', 'status', '-created_at'], name='deposit_user_status_idx'),
+            models.Index(fields=['status', '-created_at'], name='deposit_status_created_idx'),
+            models.Index(fields=['network'], name='deposit_network_idx'),
+        ]
+
+
+class Withdrawal(models.Model):
+    STATUS_CHOICES = [('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')]
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='withdrawals')
+    amount = models.DecimalField(max_digits=18, decimal_places=2)
+    network = models.CharField(max_length=32)
+    wallet_address = models.CharField(max_length=128, blank=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='pending')
+    processed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = BulkInsertQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='withdrawal_user_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='withdrawal_status_created_idx'),
+            models.Index(fields=['network'], name='withdrawal_network_idx'),
+        ]
+
+
+class CopyTrade(models.Model):
+    ACTION_CHOICES = [('buy', 'Buy'), ('sell', 'Sell')]
+    STATUS_CHOICES = [('pending', 'Pending'), ('completed', 'Completed'), ('cancelled', 'Cancelled')]
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='copy_trades')
+    pair = models.CharField(max_length=32)
+    action = models.CharField(max_length=4, choices=ACTION_CHOICES)
+    amount = models.DecimalField(max_digits=18, decimal_places=2)
+    profit = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0'))
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='pending')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = BulkInsertQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='copytrade_user_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='copytrade_status_created_idx'),
+            models.Index(fields=['action'], name='copytrade_action_idx'),
+        ]
+
+
+class Referral(models.Model):
+    referrer = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='referrals_made')
+    referee = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='referrals_received')
+    bonus_amount = models.DecimalField(max_digits=18, decimal_places=2)
+    credited_to_locked = models.BooleanField(default=True)
+    deposit = models.ForeignKey(Deposit, on_delete=models.SET_NULL, null=True, blank=True, related_name='referral_bonuses')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class DailyReward(models.Model):
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='daily_rewards')
+    amount = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.10'))
+    claimed_at = models.DateTimeField(auto_now_add=True)
+    added_to_withdrawable = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ['-claimed_at']
+        indexes = [
+            models.Index(fields=['user', '-claimed_at'], name='dailyreward_user_claimed_idx'),
+        ]
+
+
+class DailyProfit(models.Model):
+    """One rank profit credit per user per local day; the unique constraint makes crediting idempotent"""
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='daily_profits')
+    date = models.DateField()
+    amount = models.DecimalField(max_digits=18, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='dailyprofit_user_date_uniq'),
+        ]
+
+
+class DailyFinanceRollupQuerySet(models.QuerySet):
+    def record(self, **amounts):
+        """Add ``amounts`` (column -> delta) to today's totals, creating the row on first use"""
+        day = timezone.localdate()
+        self.get_or_create(day=day)
+        return self.filter(day=day).update(**{name: F(name) + amount for name, amount in amounts.items()})
+
+
+class DailyFinanceRollup(models.Model):
+    """Per-day changes to the admin dashboard's money totals, so it sums days instead of every row.
+
+    Written alongside each approval (and deposit expiry);
+    ``manage.py rebuild_finance_rollup`` recomputes it from the deposit and
+    withdrawal tables.
+    """
+    day = models.DateField(unique=True)
+    crypto_deposits = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0'))
+    local_deposits = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0'))
+    crypto_withdrawals = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0'))
+    local_withdrawals = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0'))
+
+    objects = DailyFinanceRollupQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-day']
+
+    def __str__(self):
+        return f"Finance rollup {self.day}"
+
+
+class PromoCode(models.Model):
+    STATUS_CHOICES = [('active', 'Active'), ('disabled', 'Disabled')]
+    code = models.CharField(max_length=32, unique=True)
+    bonus_min = models.DecimalField(max_digits=18, decimal_places=2)
+    bonus_max = models.DecimalField(max_digits=18, decimal_places=2)
+    expiration = models.DateTimeField(null=True, blank=True)
+    usage_limit = models.IntegerField(null=True, blank=True)
+    usage_count = models.IntegerField(default=0)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='active')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status'], name='promocode_status_idx'),
+        ]
+
+    def __str__(self):
+        return self.code
+
+
+class PromoRedemption(models.Model):
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='promo_redemptions')
+    promo_code = models.ForeignKey(PromoCode, on_delete=models.CASCADE, related_name='redemptions')
+    bonus_amount = models.DecimalField(max_digits=18, decimal_places=2)
+    credited_to_locked = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['user', 'promo_code']
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='promoredeem_user_created_idx'),
+        ]
+
+# class DailyProfit(models.Model):
+#     """Track daily profit generation for each user"""
+#     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='daily_profits')
+#     amount = models.DecimalField(max_digits=18, decimal_places=2)
+#     calculated_at = models.DateTimeField(auto_now_add=True)
+#     for_date = models.DateField()  # The date this profit is for
+#     locked_balance_used = models.DecimalField(max_digits=18, decimal_places=2)  # Balance used for calculation
+#     rank_used = models.ForeignKey(Rank, on_delete=models.SET_NULL, null=True)
+#     
+#     class Meta:
+#         unique_together = ['user', 'for_date']
+#         ordering = ['-for_date']
+
+
+DEFAULT_CONVERSION_RATE = Decimal('1600')  # NGN per USDT
+
+PAYSTACK_BANK_CODES = MappingProxyType({
+    'Access Bank': '044',
+    'Access Diamond': '044',
+    'ALAT by Wema': '035',
+    'ASO Savings': '401',
+    'Citibank': '023',
+    'Carbon': '565',
+    'Ecobank': '050',
+    'EcoBank': '050',
+    'Fidelity Bank': '070',
+    'First Bank': '011',
+    'First Bank of Nigeria': '011',
+    'First City Monument Bank': '214',
+    'FCMB': '214',
+    'FSDH Merchant': '501',
+    'Globus Bank': '103',
+    'Guaranty Trust Bank': '058',
+    'GTBank': '058',
+    'Heritage Bank': '030',
+    'Jaiz Bank': '301',
+    'Keystone Bank': '082',
+    'Kuda Bank': '50211',
+    'Moniepoint': '50215',
+    'Opay': '999992',
+    'Palmpay': '999991',
+    'Polaris Bank': '076',
+    'Providus Bank': '101',
+    'Stanbic IBTC': '221',
+    'Standard Chartered': '068',
+    'Sterling Bank': '232',
+    'Suntrust Bank': '100',
+    'Taj Bank': '302',
+    'Union Bank': '032',
+    'United Bank for Africa': '033',
+    'UBA': '033',
+    'Unity Bank': '215',
+    'Wema Bank': '035',
+    'Zenith Bank': '057',
+    'OPAY': '999992',
+})
+
+
+class LocalWithdrawal(models.Model):
+    """Local withdrawal with Paystack integration"""
+    STATUS_CHOICES = [
+        ('pending_admin_approval', 'Pending Admin Approval'),
+        ('approved', 'Approved'),
+        ('rejected', 'Rejected'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+        ('refunded', 'Refunded'),
+    ]
+    
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='local_withdrawals')
+    amount_usdt = models.DecimalField(max_digits=18, decimal_places=2)
+    conversion_rate = models.DecimalField(max_digits=10, decimal_places=2, default=DEFAULT_CONVERSION_RATE)
+    amount_ngn = models.DecimalField(max_digits=18, decimal_places=2)
+    
+    # Bank details
+    bank_name = models.CharField(max_length=100)
+    account_number = models.CharField(max_length=20)
+    account_holder_name = models.CharField(max_length=100)
+    
+    def get_bank_code(self):
+        """Get Paystack bank code from bank name"""
+        return PAYSTACK_BANK_CODES.get(self.bank_name, '999992')  # Default to OPAY if not found
+    
+    # Status and tracking
+    status = models.CharField(max_length=30, choices=STATUS_CHOICES, default='pending_admin_approval')
+    paystack_transfer_reference = models.CharField(max_length=100, null=True, blank=True, db_index=True)
+    paystack_response = models.JSONField(null=True, blank=True)
+    
+    # Admin actions
+    admin_notes = models.TextField(null=True, blank=True)
+    processed_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='processed_withdrawals')
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    objects = LocalPaymentQuerySet.as_manager()
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='localwd_user_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='localwd_status_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Local Withdrawal {self.id} - {self.user.username} - ${self.amount_usdt}"
+    
+    def get_raw_response(self):
+        """Paystack payload, fetched on demand when the row was loaded without it"""
+        if 'paystack_response' in self.get_deferred_fields():
+            self.refresh_from_db(fields=['paystack_response'])
+        return self.paystack_response
+    
+    def save(self, *args, **kwargs):
+        # Calculate NGN amount if not set
+        if self.amount_ngn is None:
+            self.amount_ngn = self.amount_usdt * self.conversion_rate
+        super().save(*args, **kwargs)
+
+
+class LocalDeposit(models.Model):
+    """Local deposit with Paystack payment"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending Payment'),
+        ('paid', 'Paid'),
+        ('confirmed', 'Confirmed'),
+        ('failed', 'Failed'),
+        ('cancelled', 'Cancelled'),
+    ]
+    
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='local_deposits')
+    amount_usdt = models.DecimalField(max_digits=18, decimal_places=2)
+    amount_ngn = models.DecimalField(max_digits=18, decimal_places=2)
+    conversion_rate = models.DecimalField(max_digits=10, decimal_places=2, default=DEFAULT_CONVERSION_RATE)
+    
+    # Referral support
+    referrer = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='referred_local_deposits')
+    
+    # Paystack integration
+    paystack_reference = models.CharField(max_length=100, unique=True)
+    paystack_access_code = models.CharField(max_length=100, null=True, blank=True)
+    paystack_response = models.JSONField(null=True, blank=True)
+    
+    # Status
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    
+    # Admin confirmation
+    confirmed_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='confirmed_deposits')
+    admin_notes = models.TextField(null=True, blank=True)
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    confirmed_at = models.DateTimeField(null=True, blank=True)
+    paid_at = models.DateTimeField(null=True, blank=True)
+    
+    objects = LocalPaymentQuerySet.as_manager()
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='localdep_user_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='localdep_status_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Local Deposit {self.id} - {self.user.username} - ${self.amount_usdt}"
+    
+    def get_raw_response(self):
+        """Paystack payload, fetched on demand when the row was loaded without it"""
+        if 'paystack_response' in self.get_deferred_fields():
+            self.refresh_from_db(fields=['paystack_response'])
+        return self.paystack_response
+    
+    def save(self, *args, **kwargs):
+        # Calculate NGN amount if not set
+        if self.amount_ngn is None:
+            self.amount_ngn = self.amount_usdt * self.conversion_rate
+        super().save(*args, **kwargs)
+
+#     def __str__(self):
+#         return f"DailyProfit({self.user.username}, {self.for_date}, ${self.amount})"
+
+
+UNREAD_COUNT_TTL = 30  # seconds
+
+
+def _unread_count_key(user_id):
+    return f'notif_unread:{user_id}'
+
+
+class NotificationQuerySet(models.QuerySet):
+    def unread_count_for(self, user_ids):
+        """Map user id -> unread notification count with one grouped COUNT"""
+        rows = (
+            self.filter(user_id__in=user_ids, is_read=False)
+            .values('user_id')
+            .annotate(c=Count('pk'))
+            .values_list('user_id', 'c')
+        )
+        return dict(rows)
+
+    def unread_count(self, user_id):
+        """Unread count for one user, cached briefly and cleared on new notifications"""
+        return cache.get_or_set(
+            _unread_count_key(user_id),
+            lambda: self.unread_count_for([user_id]).get(user_id, 0),
+            UNREAD_COUNT_TTL,
+        )
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create skips post_save, so drop the cached counts here
+        objs = super().bulk_create(objs, *args, **kwargs)
+        cache.delete_many([_unread_count_key(uid) for uid in {o.user_id for o in objs}])
+        return objs
+
+
+class Notification(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    message = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    is_read = models.BooleanField(default=False)
+
+    objects = NotificationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'is_read', '-created_at'], name='notif_user_unread_idx'),
+        ]
+
+    def __str__(self):
+        return f"Notification for {self.user.username}: {self.message[:20]}"
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def _clear_unread_count(sender, instance, **kwargs):
+    cache.delete(_unread_count_key(instance.user_id))
+
+
+FINANCE_OVERVIEW_TTL = 60  # seconds; also bounds staleness from queryset.update() writes
+
+
+def finance_overview_key(user_id):
+    return f'finance_overview:{user_id}'
+
+
+@receiver(post_save, sender=Deposit)
+@receiver(post_delete, sender=Deposit)
+@receiver(post_save, sender=Withdrawal)
+@receiver(post_delete, sender=Withdrawal)
+@receiver(post_save, sender=LocalDeposit)
+@receiver(post_delete, sender=LocalDeposit)
+@receiver(post_save, sender=LocalWithdrawal)
+@receiver(post_delete, sender=LocalWithdrawal)
+@receiver(post_save, sender=DailyReward)
+@receiver(post_delete, sender=DailyReward)
+def _clear_finance_overview(sender, instance, **kwargs):
+    cache.delete(finance_overview_key(instance.user_id))
+
+
+ADMIN_DASHBOARD_KEY = 'admin_dashboard_totals'
+ADMIN_DASHBOARD_TTL = 60  # seconds; balance updates and new signups show up within this
+
+
+@receiver(post_save, sender=Deposit)
+@receiver(post_delete, sender=Deposit)
+@receiver(post_save, sender=Withdrawal)
+@receiver(post_delete, sender=Withdrawal)
+@receiver(post_save, sender=LocalDeposit)
+@receiver(post_delete, sender=LocalDeposit)
+@receiver(post_save, sender=LocalWithdrawal)
+@receiver(post_delete, sender=LocalWithdrawal)
+def _clear_admin_dashboard(sender, **kwargs):
+    cache.delete(ADMIN_DASHBOARD_KEY)
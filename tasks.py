@@ -0,0 +1,337 @@
+# =============================================================================
+# crypto/tasks.py
+# =============================================================================
+# Periodic bookkeeping: copy trades and locked deposits (every TICK_INTERVAL)
+# and multi-account detection (every MULTI_ACCOUNT_SCAN_INTERVAL). The
+# dashboard triggers both when due, the scan in a background thread;
+# `manage.py tick_trades` and `manage.py detect_multi_accounts` run them
+# from a scheduler instead. `manage.py rebuild_finance_rollup` reconciles the
+# admin dashboard's daily totals with the deposit and withdrawal tables.
+
+import random
+import threading
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce, TruncDate, TruncHour
+from django.utils import timezone
+
+from .models import (
+    CopyTrade, CustomUser as User, DailyFinanceRollup, Deposit, LocalDeposit, LocalWithdrawal,
+    Notification, Profile, Withdrawal, ranks_by_min_balance, ADMIN_DASHBOARD_KEY,
+)
+
+TICK_INTERVAL = 5  # seconds
+TICK_LOCK_KEY = 'trade_tick_lock'
+
+
+def process_expired_deposits():
+    """Process expired deposits and update locked balance and ranks"""
+    # Get expired approved deposits
+    expired_time = timezone.now()
+    with transaction.atomic():
+        expired_deposits = list(
+            Deposit.objects.select_for_update()
+            .filter(status='approved', expires_at__lte=expired_time)
+            .order_by('approved_at')  # FIFO - oldest first
+        )
+        if not expired_deposits:
+            return
+        
+        # One locked SELECT for every affected profile
+        profiles = Profile.objects.select_for_update().in_bulk(
+            {d.user_id for d in expired_deposits}, field_name='user_id'
+        )
+        
+        expired = []
+        expired_total = Decimal('0')
+        touched = {}
+        for deposit in expired_deposits:
+            profile = profiles.get(deposit.user_id)
+            
+            # Remove expired amount from locked balance
+            if profile and profile.locked_balance >= deposit.amount:
+                profile.locked_balance -= deposit.amount
+                touched[profile.pk] = profile
+                expired.append(deposit.pk)
+                expired_total += deposit.amount
+        
+        if not expired:
+            return
+        
+        # Check which users need to be demoted, once per profile
+        ranks_by_id = {r.pk: r for r in ranks_by_min_balance()}
+        notifications = []
+        for profile in touched.values():
+            profile.sync_principal_balance()
+            old_rank = ranks_by_id.get(profile.rank_id)
+            new_rank = profile.get_rank()
+            
+            if profile.rank_id != (new_rank.pk if new_rank else None):
+                profile.rank = new_rank
+                
+                # Create notification for rank change
+                notifications.append(Notification(
+                    user_id=profile.user_id,
+                    message=f"Your rank has been demoted from {old_rank.name if old_rank else 'None'} to {new_rank.name if new_rank else 'None'} due to expired deposit."
+                ))
+        
+        Profile.objects.bulk_update(touched.values(), ['locked_balance', 'principal_balance', 'rank'], batch_size=1000)
+        Deposit.objects.filter(pk__in=expired).update(status='expired')
+        # Expired deposits leave the dashboard's approved total; update() sends no
+        # post_save, so clear the cached totals here
+        DailyFinanceRollup.objects.record(crypto_deposits=-expired_total)
+        transaction.on_commit(lambda: cache.delete(ADMIN_DASHBOARD_KEY))
+        transaction.on_commit(lambda: Notification.objects.bulk_create(notifications, batch_size=1000))
+
+
+def complete_pending_trades():
+    """Complete trades that have been pending long enough"""
+    # Complete trades older than 35 seconds
+    completion_time = timezone.now() - timedelta(seconds=35)
+    with transaction.atomic():
+        # Lock the batch so concurrent dashboard loads can't credit it twice
+        pending_trades = list(
+            CopyTrade.objects.select_for_update()
+            .filter(status='pending', created_at__lte=completion_time)
+            .values_list('pk', 'user_id', 'profit')
+        )
+        if not pending_trades:
+            return
+        
+        # Final profit is already calculated and stored; sum it per user
+        profit_by_user = {}
+        for _, user_id, profit in pending_trades:
+            profit_by_user[user_id] = profit_by_user.get(user_id, Decimal('0')) + profit
+        
+        CopyTrade.objects.filter(pk__in=[pk for pk, _, _ in pending_trades]).update(status='completed')
+        
+        # Add profit to withdrawable balances
+        Profile.objects.credit_withdrawable(profit_by_user)
+
+
+def _profit_per_trade(profile):
+    """Target profit for one copy trade: the rank's daily profit split across its trade limit"""
+    rank = profile.get_rank()
+    
+    if rank and profile.locked_balance > 0 and rank.daily_profit_pct:
+        potential_daily_profit = profile.locked_balance * (Decimal(str(rank.daily_profit_pct)) / Decimal('100'))
+    else:
+        potential_daily_profit = Decimal('0.50')
+    
+    # Calculate profit per trade (potential daily profit divided by daily trade limit)
+    try:
+        max_trades_allowed = int(rank.copy_trades_limit) if rank else 1
+    except (ValueError, AttributeError):
+        max_trades_allowed = 1  # Default to 1 trade per day
+    
+    # Calculate profit per individual trade
+    if max_trades_allowed > 0:
+        return potential_daily_profit / Decimal(str(max_trades_allowed))
+    return Decimal('0.50')  # Default minimum
+
+
+def update_pending_trades_profit():
+    """Update pending trades with fluctuating profits to simulate real trading"""
+    # Get all pending trades with their owners' profiles in one query
+    pending_trades = list(CopyTrade.objects.filter(status='pending').select_related('user__profile'))
+    now = timezone.now()
+    profit_per_trade_by_profile = {}
+    
+    for trade in pending_trades:
+        # Calculate how long the trade has been pending
+        time_elapsed = now - trade.created_at
+        seconds_elapsed = time_elapsed.total_seconds()
+        
+        # Only start showing profit after 10 seconds
+        if seconds_elapsed < 10:
+            trade.profit = Decimal('0')
+        else:
+            # Simulate fluctuating profit based on time elapsed
+            # Profit increases gradually over time
+            progress = min(seconds_elapsed / 30, 1.0)  # Full profit after 30 seconds
+            
+            # Get target profit based on user's potential daily profit; the
+            # simulation runs on floats and converts to Decimal once at the end
+            profile = trade.user.profile
+            profit_per_trade = profit_per_trade_by_profile.get(profile.pk)
+            if profit_per_trade is None:
+                profit_per_trade = float(_profit_per_trade(profile))
+                profit_per_trade_by_profile[profile.pk] = profit_per_trade
+            
+            # Add small variance to make it realistic (±5% variation)
+            variance_amount = profit_per_trade * 0.05  # 5% variance
+            variance = (0.5 + random.random()) * variance_amount  # 50% to 150% of variance
+            
+            # Randomly decide if it's slightly above or below the target
+            if random.random() < 0.6:  # 60% chance to be slightly above target
+                target_profit = profit_per_trade + variance
+            else:  # 40% chance to be slightly below target
+                target_profit = profit_per_trade - variance
+            
+            # Ensure profit is not negative
+            target_profit = max(target_profit, 0.01)
+            
+            # Remove restrictive lot size limits - use the calculated per-trade profit
+            # This ensures users reach their potential daily profit across all trades
+            
+            # Apply gradual progress with realistic fluctuation
+            fluctuation = 0.95 + 0.15 * random.random()  # 95% to 110%
+            current_profit = target_profit * progress * fluctuation
+            
+            trade.profit = Decimal(f'{current_profit:.2f}')
+    
+    CopyTrade.objects.bulk_update(pending_trades, ['profit'], batch_size=500)
+
+
+def tick_trades():
+    """Run one pass of the trade and deposit bookkeeping"""
+    update_pending_trades_profit()  # Update fluctuating profits
+    complete_pending_trades()  # Complete trades that are ready
+    process_expired_deposits()  # Process expired deposits and rank changes
+
+
+def tick_trades_if_due():
+    """Run tick_trades() unless another request ran it within TICK_INTERVAL"""
+    if cache.add(TICK_LOCK_KEY, True, TICK_INTERVAL):
+        tick_trades()
+
+
+MULTI_ACCOUNT_SCAN_INTERVAL = 600  # seconds
+MULTI_ACCOUNT_SCAN_LOCK_KEY = 'multi_account_detection_lock'
+MULTI_ACCOUNT_LAST_FLAGGED_KEY = 'last_detection_scan'  # (scan id, flagged count)
+MULTI_ACCOUNT_CHUNK_SIZE = 2000  # rows per cursor fetch when streaming matches
+
+
+def _flag_users(flags):
+    """Flag {user_id: message} with one UPDATE and one batched notification INSERT"""
+    if not flags:
+        return 0
+    User.objects.filter(pk__in=list(flags)).update(is_flagged=True)
+    Notification.objects.bulk_create(
+        [Notification(user_id=user_id, message=message) for user_id, message in flags.items()],
+        batch_size=1000,
+    )
+    return len(flags)
+
+
+def detect_and_flag_multiple_accounts():
+    """Comprehensive multi-account detection system"""
+    
+    # user_id -> message; the first pass to catch a user supplies the message,
+    # and everything is written once at the end
+    flags = {}
+    
+    candidates = User.objects.filter(is_banned=False, is_flagged=False).exclude(role='admin')
+    
+    # 1. IP-based detection (multiple accounts from same IP), grouped in SQL
+    dup_ips = (
+        candidates.filter(last_login_ip__isnull=False)
+        .order_by().values('last_login_ip').annotate(c=Count('pk')).filter(c__gte=2)
+        .values_list('last_login_ip', flat=True)
+    )
+    for pk, ip in candidates.filter(last_login_ip__in=dup_ips).values_list('pk', 'last_login_ip').iterator(chunk_size=MULTI_ACCOUNT_CHUNK_SIZE):
+        flags.setdefault(pk, f"Your account has been flagged for multiple accounts from IP address {ip}.")
+    
+    # 2. Phone-based detection (multiple accounts with same phone)
+    dup_phones = [
+        phone for phone in (
+            candidates.exclude(phone='')
+            .order_by().values('phone').annotate(c=Count('pk')).filter(c__gte=2)
+            .values_list('phone', flat=True)
+        )
+        if phone.strip()
+    ]
+    for pk, phone in candidates.filter(phone__in=dup_phones).values_list('pk', 'phone').iterator(chunk_size=MULTI_ACCOUNT_CHUNK_SIZE):
+        flags.setdefault(pk, f"Your account has been flagged for multiple accounts with phone number {phone}.")
+    
+    # 3. Device fingerprinting (same user agent + IP pattern)
+    # This would require storing user agent on login - for future enhancement
+    
+    # 4. Referral abuse detection (circular referrals): referral codes
+    # shared by more than one account, found with one grouped query
+    dup_codes = (
+        Profile.objects.exclude(user__role='admin').exclude(referral_code__isnull=True).exclude(referral_code='')
+        .order_by().values('referral_code').annotate(c=Count('pk')).filter(c__gte=2)
+        .values_list('referral_code', flat=True)
+    )
+    for pk in candidates.filter(profile__referral_code__in=dup_codes).values_list('pk', flat=True).iterator(chunk_size=MULTI_ACCOUNT_CHUNK_SIZE):
+        flags.setdefault(pk, "Your account has been flagged for referral abuse.")
+    
+    # 5. Suspicious timing patterns (multiple accounts created in short time)
+    recent_time = timezone.now() - timedelta(hours=24)
+    recent_users = candidates.filter(date_joined__gte=recent_time).annotate(hour=TruncHour('date_joined'))
+    
+    # Group by hour of creation
+    busy_hours = (
+        recent_users.order_by().values('hour').annotate(c=Count('pk')).filter(c__gte=3)  # 3+ accounts created in same hour
+        .values_list('hour', flat=True)
+    )
+    for pk in recent_users.filter(hour__in=busy_hours).values_list('pk', flat=True).iterator(chunk_size=MULTI_ACCOUNT_CHUNK_SIZE):
+        flags.setdefault(pk, "Your account has been flagged for suspicious registration patterns.")
+    
+    return _flag_users(flags)
+
+
+def store_detection_result(flagged_count):
+    """Publish a finished scan as (scan id, flagged count) so each viewer can report it once"""
+    cache.set(MULTI_ACCOUNT_LAST_FLAGGED_KEY, (timezone.now().isoformat(), flagged_count), 3600)
+
+
+def _run_detection_scan():
+    try:
+        store_detection_result(detect_and_flag_multiple_accounts())
+    finally:
+        # The thread opened its own connection; don't leave it dangling
+        connection.close()
+
+
+def detect_multiple_accounts_if_due():
+    """Start the detection scan in a background thread unless it ran within MULTI_ACCOUNT_SCAN_INTERVAL.
+
+    Returns True if a scan was started; the flagged count lands in
+    MULTI_ACCOUNT_LAST_FLAGGED_KEY when it finishes.
+    """
+    if not cache.add(MULTI_ACCOUNT_SCAN_LOCK_KEY, True, MULTI_ACCOUNT_SCAN_INTERVAL):
+        return False
+    threading.Thread(target=_run_detection_scan, daemon=True).start()
+    return True
+
+
+def rebuild_finance_rollup():
+    """Recompute every DailyFinanceRollup row from the settled deposits and withdrawals.
+
+    Each row is bucketed by the day it settled (falling back to earlier
+    timestamps for rows that never got one). On PostgreSQL the rollup table
+    is locked for the rebuild, so a concurrent ``record()`` waits and lands
+    on the new rows; on other backends run it while the site is idle.
+    Returns the number of days written.
+    """
+    sources = (
+        ('crypto_deposits', Deposit.objects.filter(status='approved'), 'amount', ('approved_at',)),
+        ('local_deposits', LocalDeposit.objects.filter(status='paid'), 'amount_usdt', ('paid_at',)),
+        ('crypto_withdrawals', Withdrawal.objects.filter(status='approved'), 'amount', ('processed_at',)),
+        ('local_withdrawals', LocalWithdrawal.objects.filter(status='completed'), 'amount_usdt',
+         ('completed_at', 'processed_at')),
+    )
+    days = defaultdict(dict)
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            # EXCLUSIVE still allows reads but blocks record() until this commits;
+            # sums taken after the lock include every increment that beat it
+            with connection.cursor() as cursor:
+                cursor.execute(f'LOCK TABLE {DailyFinanceRollup._meta.db_table} IN EXCLUSIVE MODE')
+        for column, qs, amount, done_at in sources:
+            rows = (qs.annotate(day=TruncDate(Coalesce(*done_at, 'created_at')))
+                    .values('day').annotate(total=Sum(amount)).order_by())
+            for row in rows:
+                days[row['day']][column] = row['total']
+        DailyFinanceRollup.objects.all().delete()
+        DailyFinanceRollup.objects.bulk_create(
+            DailyFinanceRollup(day=day, **totals) for day, totals in days.items()
+        )
+    return len(days)
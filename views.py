@@ -1,1971 +1,1812 @@
-# =============================================================================
-# crypto/views.py
-# Fully merged version — all user, dashboard, finance, profile, referral, and admin views
-# =============================================================================
-# pyright: reportMissingImports=false
-
-import random
-import uuid
-from decimal import Decimal
-from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth import login, logout, get_user_model
-from django.contrib.auth.decorators import login_required
-from django.contrib import messages
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods, require_POST, require_GET
-from django.db.models import Sum, Count, Q
-from django.utils import timezone
-from datetime import timedelta
-
-from .models import (
-    Deposit, Withdrawal, PromoCode, PromoRedemption, CopyTrade,
-    Profile, Referral, CustomUser as User, Rank, DailyReward, LocalDeposit, Notification
-)
-from .rank_utils import (
-    calculate_user_rank, update_user_rank, generate_daily_profit, 
-    get_copy_trade_limit, can_execute_copy_trade, get_concurrent_copy_trades,
-    is_copy_trade_limit_reached
-)
-from .forms import (
-    SignupForm, LoginForm, ProfileUpdateForm, DepositForm, WithdrawalForm,
-    PromoRedeemForm, PromoCodeCreateForm
-)
-from .utils import (
-    add_days, REFERRAL_PCT, PAIRS, LOCK_DAYS, get_client_ip, get_random_wallet, get_available_wallet,
-    generate_referral_code, is_same_day, NETWORKS, MIN_DEPOSIT, MIN_WITHDRAWAL, DAILY_REWARD
-)
-
-User = get_user_model()
-
-@csrf_exempt
-@require_http_methods(["GET"])
-@login_required(login_url='crypto:login')
-def check_deposit_status_view(request):
-    """API endpoint to check deposit status in real-time"""
-    deposit_id = request.GET.get('deposit_id')
-    deposit_type = request.GET.get('deposit_type', 'crypto')
-    
-    if not deposit_id:
-        return JsonResponse({'error': 'Deposit ID required'}, status=400)
-    
-    try:
-        if deposit_type == 'local':
-            # Check LocalDeposit status
-            from crypto.models import LocalDeposit
-            deposit = LocalDeposit.objects.get(id=deposit_id, user=request.user)
-            
-            return JsonResponse({
-                'status': deposit.status,
-                'approved': deposit.status == 'paid',
-                'rejected': deposit.status == 'failed'
-            })
-        else:
-            # Check crypto Deposit status
-            deposit = Deposit.objects.get(id=deposit_id, user=request.user)
-            
-            return JsonResponse({
-                'status': deposit.status,
-                'approved': deposit.status == 'approved',
-                'rejected': deposit.status == 'rejected'
-            })
-            
-    except (Deposit.DoesNotExist, LocalDeposit.DoesNotExist):
-        return JsonResponse({'error': 'Deposit not found'}, status=404)
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
-
-@csrf_exempt
-@require_http_methods(["POST"])
-@login_required(login_url='crypto:login')
-def clear_deposit_session_view(request):
-    """API endpoint to clear deposit session data after approval"""
-    try:
-        # Clear the last_deposit session data
-        if 'last_deposit' in request.session:
-            del request.session['last_deposit']
-            request.session.save()
-        
-        return JsonResponse({'success': True, 'message': 'Session cleared successfully'})
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
-
-@csrf_exempt
-@require_http_methods(["GET", "POST"])
-def test_webhook_view(request):
-    """Test endpoint to simulate Paystack webhooks"""
-    if request.method == 'GET':
-        # Show test form
-        return JsonResponse({
-            'message': 'Send POST request to test webhook',
-            'example_payload': {
-                'event': 'charge.success',
-                'data': {
-                    'reference': 'TEST_REF_123',
-                    'status': 'success',
-                    'amount': 10000,  # 100 NGN in kobo
-                    'customer': {
-                        'email': 'test@example.com'
-                    }
-                }
-            }
-        })
-    
-    elif request.method == 'POST':
-        # Simulate webhook
-        import json
-        from crypto.paystack_service import PaystackWebhookHandler
-        
-        try:
-            payload = json.loads(request.body)
-            event = payload.get('event', '')
-            
-            if event == 'charge.success':
-                success, message = PaystackWebhookHandler.handle_charge_success(payload)
-                return JsonResponse({
-                    'success': success,
-                    'message': message,
-                    'payload': payload
-                })
-            else:
-                return JsonResponse({
-                    'success': False,
-                    'message': f'Unsupported event: {event}'
-                })
-                
-        except Exception as e:
-            return JsonResponse({
-                'success': False,
-                'message': str(e)
-            }, status=500)
-
-@require_http_methods(["GET"])
-def webhook_status_view(request):
-    """Check webhook endpoint status"""
-    return JsonResponse({
-        'webhook_url': 'http://127.0.0.1:8000/paystack/callback/',
-        'status': 'active',
-        'test_endpoint': 'http://127.0.0.1:8000/test-webhook/',
-        'instructions': [
-            '1. For local testing, use ngrok to expose your localhost',
-            '2. Set webhook URL in Paystack dashboard to: https://your-ngrok-url.ngrok.io/paystack/callback/',
-            '3. Test with: POST to /test-webhook/ with sample payload',
-            '4. Check server logs for DEBUG messages'
-        ]
-    })
-
-@require_http_methods(["GET"])
-def public_test_paystack_view(request):
-    """Public Paystack configuration test (no login required)"""
-    from crypto.paystack_service import PaystackService
-    from django.conf import settings
-    
-    # Check configuration
-    secret_key = getattr(settings, 'PAYSTACK_SECRET_KEY', '')
-    public_key = getattr(settings, 'PAYSTACK_PUBLIC_KEY', '')
-    
-    config_status = {
-        'secret_key_configured': bool(secret_key and secret_key != 'sk_test_your_secret_key_here'),
-        'public_key_configured': bool(public_key and public_key != 'pk_test_your_public_key_here'),
-        'secret_key_prefix': secret_key[:8] if secret_key else 'Not set',
-        'public_key_prefix': public_key[:8] if public_key else 'Not set',
-    }
-    
-    # Test API connectivity
-    test_result = PaystackService.initialize_transaction(
-        amount=100,  # 100 NGN (small test amount)
-        email='test@example.com',
-        callback_url=getattr(settings, 'PAYSTACK_CALLBACK_URL', ''),
-        reference=f"TEST_{uuid.uuid4().hex[:8]}"
-    )
-    
-    return JsonResponse({
-        'config_status': config_status,
-        'test_result': test_result,
-        'is_working': test_result.get('status', False),
-        'message': 'Paystack is working!' if test_result.get('status') else 'Paystack configuration needs attention'
-    })
-
-@csrf_exempt
-@require_http_methods(["GET"])
-@login_required(login_url='crypto:login')
-def test_paystack_view(request):
-    """Test Paystack configuration and connectivity"""
-    from crypto.paystack_service import PaystackService
-    from django.conf import settings
-    
-    # Check configuration
-    secret_key = getattr(settings, 'PAYSTACK_SECRET_KEY', '')
-    public_key = getattr(settings, 'PAYSTACK_PUBLIC_KEY', '')
-    
-    config_status = {
-        'secret_key_configured': bool(secret_key and secret_key != 'sk_test_your_secret_key_here'),
-        'public_key_configured': bool(public_key and public_key != 'pk_test_your_public_key_here'),
-        'secret_key_prefix': secret_key[:8] if secret_key else 'Not set',
-        'public_key_prefix': public_key[:8] if public_key else 'Not set',
-    }
-    
-    # Test API connectivity
-    test_result = PaystackService.initialize_transaction(
-        amount=100,  # 100 NGN (small test amount)
-        email=request.user.email,
-        callback_url=getattr(settings, 'PAYSTACK_CALLBACK_URL', ''),
-        reference=f"TEST_{uuid.uuid4().hex[:8]}"
-    )
-    
-    return JsonResponse({
-        'config_status': config_status,
-        'test_result': test_result,
-        'is_working': test_result.get('status', False),
-        'message': 'Paystack is working!' if test_result.get('status') else 'Paystack configuration needs attention'
-    })
-
-@login_required(login_url='crypto:login')
-def paystack_test_page_view(request):
-    """Paystack test page"""
-    return render(request, 'crypto/paystack_test.html')
-
-def process_expired_deposits():
-    """Process expired deposits and update locked balance and ranks"""
-    from django.utils import timezone
-    from decimal import Decimal
-    
-    # Get expired approved deposits
-    expired_time = timezone.now()
-    expired_deposits = Deposit.objects.filter(
-        status='approved',
-        expires_at__lte=expired_time
-    ).order_by('approved_at')  # FIFO - oldest first
-    
-    for deposit in expired_deposits:
-        profile = deposit.user.profile
-        
-        # Remove expired amount from locked balance
-        if profile.locked_balance >= deposit.amount:
-            profile.locked_balance -= deposit.amount
-            profile.save(update_fields=['locked_balance'])
-            
-            # Mark deposit as expired
-            deposit.status = 'expired'
-            deposit.save(update_fields=['status'])
-            
-            # Check if user needs to be demoted
-            old_rank = profile.rank
-            new_rank = profile.get_rank()
-            
-            if old_rank != new_rank:
-                profile.rank = new_rank
-                profile.save(update_fields=['rank'])
-                
-                # Create notification for rank change
-                Notification.objects.create(
-                    user=deposit.user,
-                    message=f"Your rank has been demoted from {old_rank.name if old_rank else 'None'} to {new_rank.name if new_rank else 'None'} due to expired deposit."
-                )
-
-def complete_pending_trades():
-    """Complete trades that have been pending long enough"""
-    from django.utils import timezone
-    from datetime import timedelta
-    
-    # Complete trades older than 35 seconds
-    completion_time = timezone.now() - timedelta(seconds=35)
-    pending_trades = CopyTrade.objects.filter(
-        status='pending',
-        created_at__lte=completion_time
-    )
-    
-    for trade in pending_trades:
-        # Final profit is already calculated and stored
-        final_profit = trade.profit
-        
-        # Update status to completed
-        trade.status = 'completed'
-        trade.save(update_fields=['status'])
-        
-        # Add profit to withdrawable balance
-        profile = trade.user.profile
-        profile.withdrawable_balance += final_profit
-        profile.save(update_fields=['withdrawable_balance'])
-
-def update_pending_trades_profit():
-    """Update pending trades with fluctuating profits to simulate real trading"""
-    from django.utils import timezone
-    from datetime import timedelta
-    import random
-    from decimal import Decimal
-    
-    # Get all pending trades
-    pending_trades = CopyTrade.objects.filter(status='pending')
-    
-    for trade in pending_trades:
-        # Calculate how long the trade has been pending
-        time_elapsed = timezone.now() - trade.created_at
-        seconds_elapsed = time_elapsed.total_seconds()
-        
-        # Only start showing profit after 10 seconds
-        if seconds_elapsed < 10:
-            trade.profit = Decimal('0')
-        else:
-            # Simulate fluctuating profit based on time elapsed
-            # Profit increases gradually over time
-            progress = min(seconds_elapsed / 30, 1.0)  # Full profit after 30 seconds
-            
-            # Get target profit based on user's potential daily profit
-            profile = trade.user.profile
-            rank = profile.get_rank()
-            
-            if rank and profile.locked_balance > 0 and rank.daily_profit_pct:
-                potential_daily_profit = profile.locked_balance * (Decimal(str(rank.daily_profit_pct)) / Decimal('100'))
-            else:
-                potential_daily_profit = Decimal('0.50')
-            
-            # Calculate profit per trade (potential daily profit divided by daily trade limit)
-            try:
-                max_trades_allowed = int(rank.copy_trades_limit) if rank else 1
-            except (ValueError, AttributeError):
-                max_trades_allowed = 1  # Default to 1 trade per day
-            
-            # Calculate profit per individual trade
-            if max_trades_allowed > 0:
-                profit_per_trade = potential_daily_profit / Decimal(str(max_trades_allowed))
-            else:
-                profit_per_trade = Decimal('0.50')  # Default minimum
-            
-            # Add small variance to make it realistic (±5% variation)
-            variance_percentage = Decimal('0.05')  # 5% variance
-            variance_amount = profit_per_trade * variance_percentage
-            variance = (Decimal('0.5') + Decimal(str(random.random()))) * variance_amount  # 50% to 150% of variance
-            
-            # Randomly decide if it's slightly above or below the target
-            if random.random() < 0.6:  # 60% chance to be slightly above target
-                target_profit = profit_per_trade + variance
-            else:  # 40% chance to be slightly below target
-                target_profit = profit_per_trade - variance
-            
-            # Ensure profit is not negative
-            target_profit = max(target_profit, Decimal('0.01'))
-            
-            # Remove restrictive lot size limits - use the calculated per-trade profit
-            # This ensures users reach their potential daily profit across all trades
-            
-            # Apply gradual progress with realistic fluctuation
-            fluctuation = Decimal('0.95') + Decimal('0.15') * Decimal(str(random.random()))  # 95% to 110%
-            current_profit = target_profit * Decimal(str(progress)) * fluctuation
-            
-            trade.profit = current_profit
-        
-        trade.save(update_fields=['profit'])
-
-# =============================================================================
-# Helper functions
-# =============================================================================
-
-def admin_required(view_func):
-    def wrapper(request, *args, **kwargs):
-        if not request.user.is_authenticated or not (request.user.is_superuser or getattr(request.user, 'role', '') == 'admin'):
-            messages.error(request, 'You are not authorized to access this page.')
-            return redirect('crypto:login')
-        return view_func(request, *args, **kwargs)
-    return wrapper
-
-def detect_and_flag_multiple_accounts():
-    """Comprehensive multi-account detection system"""
-    from django.utils import timezone
-    from datetime import timedelta
-    from collections import defaultdict
-    
-    flagged_count = 0
-    
-    # 1. IP-based detection (multiple accounts from same IP)
-    ip_users = defaultdict(list)
-    for user in User.objects.filter(is_banned=False, is_flagged=False).exclude(role='admin'):
-        if user.last_login_ip:
-            ip_users[user.last_login_ip].append(user)
-    
-    for ip, users in ip_users.items():
-        if len(users) >= 2:  # Multiple accounts from same IP
-            # Flag all accounts from this IP
-            for user in users:
-                user.is_flagged = True
-                user.save(update_fields=['is_flagged'])
-                flagged_count += 1
-                
-                # Create notification
-                Notification.objects.create(
-                    user=user,
-                    message=f"Your account has been flagged for multiple accounts from IP address {ip}."
-                )
-    
-    # 2. Phone-based detection (multiple accounts with same phone)
-    phone_users = defaultdict(list)
-    for user in User.objects.filter(is_banned=False, is_flagged=False).exclude(role='admin'):
-        if user.phone and user.phone.strip():
-            phone_users[user.phone].append(user)
-    
-    for phone, users in phone_users.items():
-        if len(users) >= 2:  # Multiple accounts with same phone
-            for user in users:
-                user.is_flagged = True
-                user.save(update_fields=['is_flagged'])
-                flagged_count += 1
-                
-                # Create notification
-                Notification.objects.create(
-                    user=user,
-                    message=f"Your account has been flagged for multiple accounts with phone number {phone}."
-                )
-    
-    # 3. Device fingerprinting (same user agent + IP pattern)
-    # This would require storing user agent on login - for future enhancement
-    
-    # 4. Referral abuse detection (circular referrals)
-    for user in User.objects.filter(is_banned=False, is_flagged=False).exclude(role='admin'):
-        profile = getattr(user, 'profile', None)
-        if profile and profile.referral_code:
-            # Check if user is referring themselves through other accounts
-            referred_users = User.objects.filter(
-                profile__referral_code=profile.referral_code
-            ).exclude(pk=user.pk)
-            
-            if referred_users.exists():
-                user.is_flagged = True
-                user.save(update_fields=['is_flagged'])
-                flagged_count += 1
-                
-                Notification.objects.create(
-                    user=user,
-                    message="Your account has been flagged for referral abuse."
-                )
-    
-    # 5. Suspicious timing patterns (multiple accounts created in short time)
-    recent_time = timezone.now() - timedelta(hours=24)
-    recent_users = User.objects.filter(
-        date_joined__gte=recent_time,
-        is_banned=False,
-        is_flagged=False
-    ).exclude(role='admin')
-    
-    # Group by hour of creation
-    hour_groups = defaultdict(list)
-    for user in recent_users:
-        hour_key = user.date_joined.replace(minute=0, second=0, microsecond=0)
-        hour_groups[hour_key].append(user)
-    
-    for hour, users in hour_groups.items():
-        if len(users) >= 3:  # 3+ accounts created in same hour
-            for user in users:
-                user.is_flagged = True
-                user.save(update_fields=['is_flagged'])
-                flagged_count += 1
-                
-                Notification.objects.create(
-                    user=user,
-                    message=f"Your account has been flagged for suspicious registration patterns."
-                )
-    
-    return flagged_count
-
-def _check_multi_account(ip, phone, exclude_user_id=None):
-    """Legacy function - kept for compatibility"""
-    q = Q()
-    if ip:
-        q |= Q(last_login_ip=ip)
-    if phone:
-        q |= Q(phone=phone)
-    if not q:
-        return False, 0
-    qs = User.objects.filter(q).exclude(role='admin')
-    if exclude_user_id:
-        qs = qs.exclude(pk=exclude_user_id)
-    n = qs.count()
-    return n >= 2, n
-
-def _flag_multi_accounts(ip, phone):
-    """Legacy function - kept for compatibility"""
-    q = Q()
-    if ip:
-        q |= Q(last_login_ip=ip)
-    if phone:
-        q |= Q(phone=phone)
-    if not q:
-        return 0
-    return User.objects.filter(q).exclude(role='admin').update(is_flagged=True)
-
-def _update_user_rank(user):
-    """Update user rank based on principal balance only"""
-    try:
-        profile = Profile.objects.select_related('rank').get(user=user)
-        profile.update_rank()
-        return profile.rank
-    except Profile.DoesNotExist:
-        return None
-
-def calculate_daily_profit(user):
-    """Calculate daily profit for user - idempotent, once per day"""
-    try:
-        profile = Profile.objects.select_related('rank').get(user=user)
-    except Profile.DoesNotExist:
-        return None
-    
-    # Safety invariants
-    if profile.locked_balance <= 0:
-        return None
-    
-    rank = profile.get_rank()
-    if not rank:
-        return None
-    
-    # TODO: Implement DailyProfit tracking after migration
-    # For now, just calculate and return the amount
-    daily_profit_amount = profile.locked_balance * (rank.daily_profit_percentage / Decimal('100'))
-    
-    if daily_profit_amount <= 0:
-        return None
-    
-    # Add profit to withdrawable balance
-    profile.withdrawable_balance += daily_profit_amount
-    profile.save(update_fields=['withdrawable_balance'])
-    
-    return daily_profit_amount
-
-def get_concurrent_copy_trades(user):
-    """Get count of copy trades in the last 24 hours"""
-    from django.utils import timezone
-    from datetime import timedelta
-    
-    last_24_hours = timezone.now() - timedelta(hours=24)
-    return CopyTrade.objects.filter(
-        user=user, 
-        created_at__gte=last_24_hours
-    ).count()
-
-# =============================================================================
-# Auth
-# =============================================================================
-
-@require_http_methods(['GET', 'POST'])
-def login_view(request):
-    if request.user.is_authenticated:
-        return redirect('crypto:dashboard')
-    form = LoginForm(request, data=request.POST or None)
-    if request.method == 'POST' and form.is_valid():
-        user = form.get_user()
-        if user.is_banned:
-            messages.error(request, 'Account banned.')
-            return redirect('crypto:login')
-        ip = get_client_ip(request)
-        user.last_login_ip = ip
-        user.save(update_fields=['last_login_ip'])
-        multi, _ = _check_multi_account(ip, user.phone, user.pk)
-        if multi:
-            _flag_multi_accounts(ip, user.phone)
-        login(request, user)
-        messages.success(request, 'Logged in.')
-        next_url = request.GET.get('next') or 'crypto:dashboard'
-        return redirect(next_url)
-    return render(request, 'crypto/login.html', {'form': form})
-
-@require_http_methods(['GET', 'POST'])
-def signup_view(request):
-    if request.user.is_authenticated:
-        return redirect('crypto:dashboard')
-    form = SignupForm(request.POST or None)
-    if request.method == 'POST' and form.is_valid():
-        ip = get_client_ip(request)
-        if User.objects.filter(last_login_ip=ip, is_banned=True).exists():
-            messages.error(request, 'Access denied.')
-            return redirect('crypto:signup')
-        user = form.save(commit=False)
-        user.role = 'user'
-        user.save()
-        multi, _ = _check_multi_account(ip, getattr(user, 'phone', None), user.pk)
-        if multi:
-            _flag_multi_accounts(ip, getattr(user, 'phone', None))
-        code = generate_referral_code()
-        while Profile.objects.filter(referral_code=code).exists():
-            code = generate_referral_code()
-        Profile.objects.create(user=user, referral_code=code)
-        login(request, user)
-        messages.success(request, 'Account created.')
-        return redirect('crypto:dashboard')
-    return render(request, 'crypto/signup.html', {'form': form})
-
-@require_GET
-def logout_view(request):
-    logout(request)
-    messages.info(request, 'Logged out.')
-    return redirect('crypto:login')
-
-# Dashboard
-# =============================================================================
-
-@login_required(login_url='crypto:login')
-def dashboard_view(request):
-    if request.user.is_banned:
-        logout(request)
-        return redirect('crypto:login')
-    
-    # Process any pending trades (realistic delay processing)
-    update_pending_trades_profit()  # Update fluctuating profits
-    complete_pending_trades()  # Complete trades that are ready
-    process_expired_deposits()  # Process expired deposits and rank changes
-    
-    # Run multi-account detection periodically (every 50th visit to reduce overhead)
-    import random
-    if random.randint(1, 50) == 1:  # 2% chance on each dashboard load (reduced from 10%)
-        flagged_count = detect_and_flag_multiple_accounts()
-        if flagged_count > 0 and request.user.is_staff:
-            messages.info(request, f"Auto-detected and flagged {flagged_count} accounts for multi-account abuse.")
-    
-    # TODO: Fix admin redirect after database is properly set up
-    # Temporarily disable admin redirect to avoid loops
-    # if request.user.is_staff or getattr(request.user, 'role', '') == 'admin':
-    #     return redirect('crypto:admin_dashboard')
-    
-    profile = getattr(request.user, 'profile', None)
-    if not profile:
-        # Create profile if it doesn't exist
-        from crypto.models import Profile
-        try:
-            profile = Profile.objects.create(user=request.user, referral_code='TEMP123')
-        except Exception:
-            # If profile creation fails, redirect to login
-            return redirect('crypto:login')
-    
-    # Update rank based on current principal balance
-    profile.update_rank()
-    rank = profile.rank
-    
-    # Calculate daily profit if eligible (only once per day)
-    # Check if profit already calculated for today
-    from django.utils import timezone
-    from datetime import timedelta
-    today = timezone.now().date()
-    
-    # Since DailyProfit model is commented out, we'll use a simple approach
-    # Calculate today's actual profit from copy trades + potential daily profit
-    last_24_hours = timezone.now() - timedelta(hours=24)
-    
-    # Get copy trades from today (since midnight)
-    today_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    copy_trades_today = CopyTrade.objects.filter(
-        user=request.user,
-        created_at__gte=today_start
-    )
-    
-    # Calculate today's actual profit from copy trades
-    copy_trade_profit_today = copy_trades_today.aggregate(
-        total=Sum('profit')
-    )['total'] or Decimal('0')
-    
-    # Calculate potential daily profit from rank
-    if rank and profile.locked_balance > 0 and rank.daily_profit_pct:
-        potential_daily_profit = profile.locked_balance * (Decimal(str(rank.daily_profit_pct)) / Decimal('100'))
-    else:
-        potential_daily_profit = Decimal('0')
-    
-    # Today's total profit = copy trade profit from today
-    daily_profit_amount = copy_trade_profit_today
-    
-    # Use the calculated values
-    todays_potential_profit = potential_daily_profit
-    
-    # Calculate copy trade profit in last 24 hours (separate from today's profit)
-    copy_trades_24h = CopyTrade.objects.filter(
-        user=request.user,
-        created_at__gte=last_24_hours
-    )
-    total_copy_trade_profit_24h = copy_trades_24h.aggregate(
-        total=Sum('profit')
-    )['total'] or Decimal('0')
-    
-    # Count profitable vs loss trades in last 24 hours
-    profitable_trades_24h = copy_trades_24h.filter(profit__gt=0).count()
-    loss_trades_24h = copy_trades_24h.filter(profit__lt=0).count()
-    
-    # Get copy trade limit safely
-    try:
-        limit = int(rank.max_copy_trades) if rank else 0
-    except (ValueError, AttributeError):
-        try:
-            limit = int(rank.copy_trades_limit) if rank else 0
-        except (ValueError, AttributeError):
-            limit = 5  # Default limit
-    trades = CopyTrade.objects.filter(user=request.user).order_by('-created_at')[: max(limit, 20)]
-    pending_deposits = Deposit.objects.filter(user=request.user, status='pending').order_by('-created_at')
-    last_reward = DailyReward.objects.filter(user=request.user).order_by('-claimed_at').first()
-    can_claim = not last_reward or not is_same_day(last_reward.claimed_at, timezone.now())
-    ranks = list(Rank.objects.order_by('min_balance'))
-    
-    # Mark current rank
-    for r in ranks:
-        r.is_current = rank and r.pk == rank.pk
-    
-    ctx = {
-        'profile': profile,
-        'copy_trades': trades,
-        'copy_trades_limit': limit,
-        'pending_deposits': pending_deposits,
-        'can_claim_daily': can_claim,
-        'daily_reward_amount': DAILY_REWARD,
-        'ranks': ranks,
-        'min_withdrawal': MIN_WITHDRAWAL,
-        'todays_profit': daily_profit_amount or Decimal('0'),
-        'todays_potential_profit': todays_potential_profit,
-        'rank': rank,
-    }
-    return render(request, 'crypto/dashboard.html', ctx)
-
-@login_required(login_url='crypto:login')
-@require_POST
-def daily_reward_view(request):
-    if request.user.is_banned:
-        return redirect('crypto:login')
-    profile = get_object_or_404(Profile, user=request.user)
-    last = DailyReward.objects.filter(user=request.user).order_by('-claimed_at').first()
-    if last and is_same_day(last.claimed_at, timezone.now()):
-        messages.warning(request, 'Already claimed today.')
-        return redirect('crypto:dashboard')
-    profile.withdrawable_balance += DAILY_REWARD
-    profile.save(update_fields=['withdrawable_balance'])
-    DailyReward.objects.create(user=request.user, amount=DAILY_REWARD)
-    _update_user_rank(request.user)
-    messages.success(request, f'Daily reward ${DAILY_REWARD} claimed.')
-    return redirect('crypto:dashboard')
-
-# --------------------------------------------------------------------------
-# Copy trade simulation (user)
-# --------------------------------------------------------------------------
-
-@login_required(login_url='crypto:login')
-@require_POST
-def copy_trade_simulate_view(request):
-    if request.user.is_banned:
-        return redirect('crypto:login')
-    profile = get_object_or_404(Profile, user=request.user)
-    rank = profile.get_rank()
-    
-    # Safety check: user must have a rank to trade
-    if not rank:
-        messages.warning(request, 'No rank assigned. Cannot execute copy trades.')
-        return redirect('crypto:dashboard')
-    
-    # Check copy trade limit for last 24 hours
-    trades_last_24h = get_concurrent_copy_trades(request.user)
-    # Get max trades allowed safely
-    try:
-        max_trades_allowed = int(rank.max_copy_trades) if rank else 0
-    except (ValueError, AttributeError):
-        try:
-            max_trades_allowed = int(rank.copy_trades_limit) if rank else 0
-        except (ValueError, AttributeError):
-            max_trades_allowed = 5  # Default limit
-    
-    if trades_last_24h >= max_trades_allowed:
-        messages.warning(request, f'Copy trade limit reached for the last 24 hours ({max_trades_allowed}/{max_trades_allowed}). Try again tomorrow.')
-        return redirect('crypto:dashboard')
-    
-    messages.info(request, f'Copy trades used: {trades_last_24h}/{max_trades_allowed} in last 24 hours')
-    
-    # Safety check: must have principal balance
-    if profile.principal_balance <= 0:
-        messages.warning(request, 'Insufficient balance to execute copy trades.')
-        return redirect('crypto:dashboard')
-    
-    pair = random.choice(PAIRS)
-    action = random.choice(['buy', 'sell'])
-    # Small lot size for copy trading (0.01 to 0.1) - generates big profit from small lots
-    lot_amount = Decimal('0.01') + Decimal('0.09') * Decimal(str(random.random()))  # 0.01 to 0.10
-    amount = lot_amount
-    
-    # Generate realistic profit/loss for the trade (can be positive or negative)
-    # 100% win rate - players always win with profits close to potential daily profit
-    # Calculate target daily profit based on user's rank
-    if rank and profile.locked_balance > 0 and rank.daily_profit_pct:
-        potential_daily_profit = profile.locked_balance * (Decimal(str(rank.daily_profit_pct)) / Decimal('100'))
-    else:
-        potential_daily_profit = Decimal('0.50')  # Default minimum target
-    
-    # Calculate profit per trade (potential daily profit divided by daily trade limit)
-    # This ensures users reach potential daily profit when executing maximum trades
-    try:
-        max_trades_allowed = int(rank.copy_trades_limit) if rank else 1
-    except (ValueError, AttributeError):
-        max_trades_allowed = 1  # Default to 1 trade per day
-    
-    # Calculate profit per individual trade
-    if max_trades_allowed > 0:
-        profit_per_trade = potential_daily_profit / Decimal(str(max_trades_allowed))
-    else:
-        profit_per_trade = Decimal('0.50')  # Default minimum
-    
-    # Add small variance to make it realistic (±5% variation)
-    variance_percentage = Decimal('0.05')  # 5% variance
-    variance_amount = profit_per_trade * variance_percentage
-    variance = (Decimal('0.5') + Decimal(str(random.random()))) * variance_amount  # 50% to 150% of variance
-    
-    # Randomly decide if it's slightly above or below the target
-    if random.random() < 0.6:  # 60% chance to be slightly above target
-        trade_profit = profit_per_trade + variance
-    else:  # 40% chance to be slightly below target
-        trade_profit = profit_per_trade - variance
-    
-    # Ensure profit is not negative
-    trade_profit = max(trade_profit, Decimal('0.01'))
-    
-    # Remove restrictive lot size limits - use the calculated per-trade profit
-    # This ensures users reach their potential daily profit across all trades
-    
-    # Create copy trade with initial status 'pending' (realistic delay)
-    trade = CopyTrade.objects.create(
-        user=request.user, 
-        pair=pair, 
-        action=action, 
-        amount=amount, 
-        profit=Decimal('0'),  # Start with 0 profit
-        status='pending'  # Pending status for realistic delay
-    )
-    
-    messages.success(request, f'Copy trade submitted: {pair} {action} — ${amount:.2f}. Processing...')
-    return redirect('crypto:dashboard')
-
-# =============================================================================
-# Finance
-# =============================================================================
-
-@login_required(login_url='crypto:login')
-def finance_view(request):
-    if request.user.is_banned:
-        return redirect('crypto:login')
-    from django.conf import settings
-    from django.utils import timezone
-    import datetime
-    
-    profile = getattr(request.user, 'profile', None)
-    
-    # Crypto deposits and withdrawals
-    # Crypto deposits
-    deposits = Deposit.objects.filter(user=request.user).order_by('-created_at')
-    withdrawals = Withdrawal.objects.filter(user=request.user).order_by('-created_at')
-    total_deposits = deposits.filter(status='approved').aggregate(s=Sum('amount'))['s'] or Decimal('0')
-    pending_deposits = deposits.filter(status='pending').aggregate(s=Sum('amount'))['s'] or Decimal('0')
-    total_withdrawals = withdrawals.filter(status='approved').aggregate(s=Sum('amount'))['s'] or Decimal('0')
-    
-    # Local deposits and withdrawals
-    from crypto.models import LocalDeposit, LocalWithdrawal
-    local_deposits = LocalDeposit.objects.filter(user=request.user).order_by('-created_at')
-    local_withdrawals = LocalWithdrawal.objects.filter(user=request.user).order_by('-created_at')
-    total_local_deposits = local_deposits.filter(status='paid').aggregate(s=Sum('amount_usdt'))['s'] or Decimal('0')
-    pending_local_deposits = local_deposits.filter(status='pending').aggregate(s=Sum('amount_usdt'))['s'] or Decimal('0')
-    total_local_withdrawals = local_withdrawals.filter(status='completed').aggregate(s=Sum('amount_usdt'))['s'] or Decimal('0')
-    
-    # Combine all deposits into a single list sorted by date
-    all_deposits = []
-    
-    # Add crypto deposits
-    for deposit in deposits:
-        all_deposits.append({
-            'pk': deposit.id,
-            'id': deposit.id,
-            'user': deposit.user,
-            'amount': deposit.amount,
-            'type': 'crypto',
-            'network': deposit.network,
-            'wallet_address': deposit.wallet_address,
-            'status': deposit.status,
-            'created_at': deposit.created_at,
-            'approved_at': deposit.approved_at,
-            'referrer': deposit.referrer,
-        })
-    
-    # Add Paystack deposits
-    for deposit in local_deposits:
-        all_deposits.append({
-            'pk': deposit.id,
-            'id': deposit.id,
-            'user': deposit.user,
-            'amount': deposit.amount_usdt,
-            'type': 'paystack',
-            'network': f'Paystack NGN (₦{deposit.amount_ngn:.2f})',
-            'wallet_address': deposit.paystack_reference,
-            'status': 'paid' if deposit.status == 'paid' else deposit.status,
-            'created_at': deposit.created_at,
-            'approved_at': deposit.paid_at,
-            'referrer': deposit.referrer,
-        })
-    
-    # Sort all deposits by created_at (newest first)
-    all_deposits.sort(key=lambda x: x['created_at'], reverse=True)
-    
-    # Combine crypto and local withdrawals into a single list
-    all_withdrawals = []
-    
-    # Add crypto withdrawals
-    for withdrawal in withdrawals:
-        all_withdrawals.append({
-            'pk': withdrawal.id,
-            'amount': withdrawal.amount,
-            'type': 'crypto',
-            'network': withdrawal.network,
-            'wallet_address': withdrawal.wallet_address,
-            'status': withdrawal.status,
-            'created_at': withdrawal.created_at,
-            'processed_at': withdrawal.processed_at,
-        })
-    
-    # Add local withdrawals
-    for withdrawal in local_withdrawals:
-        all_withdrawals.append({
-            'pk': withdrawal.id,
-            'amount': withdrawal.amount_usdt,
-            'type': 'local',
-            'network': f'{withdrawal.bank_name} ({withdrawal.account_number})',
-            'wallet_address': f'{withdrawal.account_holder_name}',
-            'status': withdrawal.status,
-            'created_at': withdrawal.created_at,
-            'processed_at': withdrawal.processed_at,
-        })
-    
-    # Sort all withdrawals by created_at (newest first)
-    all_withdrawals.sort(key=lambda x: x['created_at'], reverse=True)
-    
-    ref_bonus = profile.referral_earnings if profile else Decimal('0')
-    daily_sum = DailyReward.objects.filter(user=request.user).aggregate(s=Sum('amount'))['s'] or Decimal('0')
-    
-    # Forms
-    from crypto.forms import LocalDepositForm, LocalWithdrawalForm
-    deposit_form = DepositForm(request.POST or None)
-    withdrawal_form = WithdrawalForm(request.POST or None)
-    local_deposit_form = LocalDepositForm(request.POST or None)
-    local_withdrawal_form = LocalWithdrawalForm(request.POST or None, user=request.user)
-    
-    last_deposit = request.session.get('last_deposit')
-    
-    # Check if deposit has expired (5 minutes)
-    if last_deposit:
-        created_at_str = last_deposit.get('created_at')
-        if created_at_str:
-            try:
-                # Parse the timestamp and check if it's older than 5 minutes
-                created_at = datetime.datetime.fromisoformat(created_at_str.replace('Z', '+00:00'))
-                current_time = timezone.now()
-                time_diff = current_time - created_at
-                
-                if time_diff.total_seconds() >= 300:  # 5 minutes = 300 seconds
-                    # Deposit expired, remove from session
-                    del request.session['last_deposit']
-                    last_deposit = None
-                    messages.info(request, 'Your previous deposit wallet address has expired. Please create a new deposit.')
-            except (ValueError, AttributeError):
-                # Invalid timestamp, remove the deposit
-                del request.session['last_deposit']
-                last_deposit = None
-    
-    # Convert session data to object-like structure for template
-    if last_deposit:
-        class LastDeposit:
-            def __init__(self, data):
-                self.amount = data.get('amount')
-                self.network = data.get('network')
-                self.wallet_address = data.get('wallet_address')
-                self.created_at = data.get('created_at')
-                self.created_timestamp = data.get('created_timestamp')
-                self.deposit_id = data.get('deposit_id')
-                self.deposit_type = data.get('deposit_type', 'crypto')
-                self.paystack_reference = data.get('paystack_reference')
-        
-        last_deposit = LastDeposit(last_deposit)
-
-    if request.method == 'POST':
-        # Crypto deposit submission
-        if 'deposit' in request.POST and deposit_form.is_valid():
-            amt = deposit_form.cleaned_data['amount']
-            net = deposit_form.cleaned_data['network']
-            ref_code = (deposit_form.cleaned_data.get('referrer_code') or '').strip()
-            ref = None
-            if ref_code:
-                p = Profile.objects.filter(referral_code=ref_code).exclude(user=request.user).first()
-                if p:
-                    ref = p.user
-            
-            # Get available wallet with 5-minute assignment
-            wallet, time_remaining = get_available_wallet(net, request.user.id)
-            
-            if wallet is None:
-                # No wallet available, show waiting message
-                minutes = int(time_remaining // 60)
-                seconds = int(time_remaining % 60)
-                messages.warning(request, f'No wallet available. Please wait {minutes}m {seconds}s for a wallet to be released.')
-                return redirect('crypto:finance')
-            
-            deposit = Deposit.objects.create(
-                user=request.user,
-                amount=amt,
-                network=net,
-                wallet_address=wallet,
-                referrer=ref,
-                status='pending'
-            )
-            
-            # Store deposit info for modal
-            deposit_data = {
-                'amount': float(amt),
-                'network': net,
-                'wallet_address': wallet,
-                'created_at': timezone.now().isoformat(),
-                'created_timestamp': int(timezone.now().timestamp()),  # Add Unix timestamp
-                'expires_at': (timezone.now() + datetime.timedelta(minutes=5)).isoformat(),
-                'deposit_id': deposit.id  # Add deposit ID for status checking
-            }
-            request.session['last_deposit'] = deposit_data
-            
-            messages.success(request, f'Deposit request of ${amt} submitted. Send ${amt} to {wallet}.')
-            return redirect('crypto:finance')
-        
-        # Local deposit submission
-        elif 'local_deposit' in request.POST and local_deposit_form.is_valid():
-            amount_usdt = local_deposit_form.cleaned_data['amount_usdt']
-            conversion_rate = getattr(settings, 'LOCAL_PAYMENT_CONVERSION_RATE', 1600)
-            amount_ngn = amount_usdt * conversion_rate
-            
-            # Create deposit record
-            from crypto.models import LocalDeposit
-            from crypto.paystack_service import PaystackService
-            deposit = LocalDeposit.objects.create(
-                user=request.user,
-                amount_usdt=amount_usdt,
-                amount_ngn=amount_ngn,
-                conversion_rate=conversion_rate,
-                paystack_reference=f"DEP_{uuid.uuid4().hex[:12]}"
-            )
-            
-            # Initialize Paystack transaction immediately (no timer needed)
-            callback_url = getattr(settings, 'PAYSTACK_CALLBACK_URL', 'http://127.0.0.1:8000/paystack/callback/')
-            paystack_response = PaystackService.initialize_transaction(
-                amount=amount_ngn,
-                email=request.user.email,
-                callback_url=callback_url,
-                reference=deposit.paystack_reference
-            )
-            
-            if paystack_response.get('status'):
-                # Update deposit with Paystack reference
-                deposit.paystack_reference = paystack_response['data']['reference']
-                deposit.save(update_fields=['paystack_reference'])
-                
-                # Redirect to Paystack immediately (no modal)
-                return redirect(paystack_response['data']['authorization_url'])
-            else:
-                messages.error(request, "Failed to initialize Paystack payment. Please try again.")
-                return redirect('crypto:finance')
-        
-        # Crypto withdrawal submission
-        elif 'withdrawal' in request.POST and withdrawal_form.is_valid():
-            amt = withdrawal_form.cleaned_data['amount']
-            net = withdrawal_form.cleaned_data['network']
-            wallet = withdrawal_form.cleaned_data.get('wallet_address', '')
-            if amt > profile.withdrawable_balance:
-                messages.error(request, 'Insufficient withdrawable balance.')
-                return redirect('crypto:finance')
-            profile.withdrawable_balance -= amt
-            profile.save(update_fields=['withdrawable_balance'])
-            Withdrawal.objects.create(
-                user=request.user,
-                amount=amt,
-                network=net,
-                wallet_address=wallet,
-                status='pending_admin_approval'
-            )
-            profile.last_withdrawal_at = timezone.now()
-            profile.save(update_fields=['last_withdrawal_at'])
-            profile.update_rank()
-            messages.success(request, 'Withdrawal submitted. Admin approval required.')
-            return redirect('crypto:finance')
-        
-        # Local withdrawal submission
-        elif 'local_withdrawal' in request.POST and local_withdrawal_form.is_valid():
-            amount_usdt = local_withdrawal_form.cleaned_data['amount_usdt']
-            bank_name = local_withdrawal_form.cleaned_data['bank_name']
-            account_number = local_withdrawal_form.cleaned_data['account_number']
-            account_holder_name = local_withdrawal_form.cleaned_data['account_holder_name']
-            
-            conversion_rate = 1430  # ₦1430 = 1 USDT for withdrawals
-            amount_ngn = amount_usdt * conversion_rate
-            
-            # Deduct funds immediately
-            if amount_usdt > profile.withdrawable_balance:
-                messages.error(request, "Insufficient balance")
-                return redirect('crypto:finance')
-            
-            profile.withdrawable_balance -= amount_usdt
-            profile.save(update_fields=['withdrawable_balance'])
-            
-            # Create withdrawal record
-            from crypto.models import LocalWithdrawal
-            withdrawal = LocalWithdrawal.objects.create(
-                user=request.user,
-                amount_usdt=amount_usdt,
-                amount_ngn=amount_ngn,
-                conversion_rate=conversion_rate,
-                bank_name=bank_name,
-                account_number=account_number,
-                account_holder_name=account_holder_name,
-                status='pending_admin_approval'
-            )
-            
-            messages.success(request, f"Local withdrawal request of ${amount_usdt} submitted successfully. Awaiting admin approval.")
-            return redirect('crypto:finance')
-
-    ctx = {
-        'profile': profile,
-        'overview': {
-            'total_deposits': total_deposits + total_local_deposits,
-            'pending_deposits': pending_deposits + pending_local_deposits,
-            'total_withdrawals': total_withdrawals + total_local_withdrawals,
-            'referral_bonuses': ref_bonus,
-            'daily_rewards': daily_sum,
-        },
-        'all_deposits': all_deposits,  # Combined and sorted deposits
-        'all_withdrawals': all_withdrawals,  # Combined and sorted withdrawals
-        'withdrawals': withdrawals,
-        'local_withdrawals': local_withdrawals,
-        'networks': NETWORKS,
-        'min_deposit': MIN_DEPOSIT,
-        'min_withdrawal': MIN_WITHDRAWAL,
-        'deposit_form': deposit_form,
-        'withdrawal_form': withdrawal_form,
-        'local_deposit_form': local_deposit_form,
-        'local_withdrawal_form': local_withdrawal_form,
-        'last_deposit': last_deposit,
-        'conversion_rate': getattr(settings, 'LOCAL_PAYMENT_CONVERSION_RATE', 1600),
-    }
-    return render(request, 'crypto/finance.html', ctx)
-# =============================================================================
-
-@login_required(login_url='crypto:login')
-def profile_view(request):
-    if request.user.is_banned:
-        return redirect('crypto:login')
-    profile = get_object_or_404(Profile, user=request.user)
-    
-    if request.method == 'POST':
-        form = ProfileUpdateForm(request.POST, request.FILES, user=request.user, instance=profile)
-        
-        if form.is_valid():
-            form.save()
-            messages.success(request, 'Profile updated successfully!')
-            # Reload the profile to get updated data
-            profile.refresh_from_db()
-            # Create new form with updated instance
-            form = ProfileUpdateForm(user=request.user, instance=profile)
-    else:
-        form = ProfileUpdateForm(user=request.user, instance=profile)
-    
-    ctx = {'profile': profile, 'form': form, 'user': request.user}
-    return render(request, 'crypto/profile.html', ctx)
-
-# =============================================================================
-# Contact Us
-# =============================================================================
-
-def contact_view(request):
-    """Contact us page with links to support channels"""
-    return render(request, 'crypto/contact.html')
-
-# =============================================================================
-# Local Payments
-# =============================================================================
-
-@login_required(login_url='crypto:login')
-def local_deposit_view(request):
-    """Handle local deposit with Paystack"""
-    if request.user.is_banned:
-        return redirect('crypto:login')
-    
-    from crypto.forms import LocalDepositForm
-    from crypto.models import LocalDeposit
-    from crypto.paystack_service import PaystackService
-    from django.conf import settings
-    
-    if request.method == 'POST':
-        form = LocalDepositForm(request.POST)
-        if form.is_valid():
-            amount_usdt = form.cleaned_data['amount_usdt']
-            conversion_rate = getattr(settings, 'LOCAL_PAYMENT_CONVERSION_RATE', 1600)
-            amount_ngn = amount_usdt * conversion_rate
-            
-            # Create deposit record
-            deposit = LocalDeposit.objects.create(
-                user=request.user,
-                amount_usdt=amount_usdt,
-                amount_ngn=amount_ngn,
-                conversion_rate=conversion_rate,
-                paystack_reference=f"DEP_{uuid.uuid4().hex[:12]}"
-            )
-            
-            # Initialize Paystack transaction
-            callback_url = getattr(settings, 'PAYSTACK_CALLBACK_URL', 'http://127.0.0.1:8000/paystack/callback/')
-            paystack_response = PaystackService.initialize_transaction(
-                amount=amount_ngn,
-                email=request.user.email,
-                callback_url=callback_url,
-                reference=deposit.paystack_reference
-            )
-            
-            if paystack_response.get('status'):
-                deposit.paystack_response = paystack_response
-                deposit.paystack_access_code = paystack_response['data']['access_code']
-                deposit.save()
-                
-                # Redirect to Paystack payment page
-                authorization_url = paystack_response['data']['authorization_url']
-                return redirect(authorization_url)
-            else:
-                messages.error(request, f"Payment initialization failed: {paystack_response.get('message', 'Unknown error')}")
-                deposit.delete()
-    else:
-        form = LocalDepositForm()
-    
-    # Get user's recent deposits
-    recent_deposits = LocalDeposit.objects.filter(user=request.user).order_by('-created_at')[:5]
-    
-    ctx = {
-        'form': form,
-        'recent_deposits': recent_deposits,
-        'conversion_rate': getattr(settings, 'LOCAL_PAYMENT_CONVERSION_RATE', 1600),
-    }
-    return render(request, 'crypto/local_deposit.html', ctx)
-
-
-@login_required(login_url='crypto:login')
-def local_withdrawal_view(request):
-    """Handle local withdrawal with bank details"""
-    if request.user.is_banned:
-        return redirect('crypto:login')
-    
-    from crypto.forms import LocalWithdrawalForm
-    from crypto.models import LocalWithdrawal
-    from django.conf import settings
-    
-    if request.method == 'POST':
-        form = LocalWithdrawalForm(request.POST, user=request.user)
-        if form.is_valid():
-            amount_usdt = form.cleaned_data['amount_usdt']
-            bank_name = form.cleaned_data['bank_name']
-            account_number = form.cleaned_data['account_number']
-            account_holder_name = form.cleaned_data['account_holder_name']
-            
-            conversion_rate = 1430  # ₦1430 = 1 USDT for withdrawals
-            amount_ngn = amount_usdt * conversion_rate
-            
-            # Deduct funds immediately
-            profile = request.user.profile
-            if amount_usdt > profile.withdrawable_balance:
-                messages.error(request, "Insufficient balance")
-                return redirect('crypto:local_withdrawal')
-            
-            profile.withdrawable_balance -= amount_usdt
-            profile.save(update_fields=['withdrawable_balance'])
-            
-            # Create withdrawal record
-            withdrawal = LocalWithdrawal.objects.create(
-                user=request.user,
-                amount_usdt=amount_usdt,
-                amount_ngn=amount_ngn,
-                conversion_rate=conversion_rate,
-                bank_name=bank_name,
-                account_number=account_number,
-                account_holder_name=account_holder_name,
-                status='pending_admin_approval'
-            )
-            
-            messages.success(request, f"Withdrawal request of ${amount_usdt} submitted successfully. Awaiting admin approval.")
-            return redirect('crypto:local_withdrawal')
-    else:
-        form = LocalWithdrawalForm(user=request.user)
-    
-    # Get user's recent withdrawals
-    recent_withdrawals = LocalWithdrawal.objects.filter(user=request.user).order_by('-created_at')[:5]
-    
-    ctx = {
-        'form': form,
-        'recent_withdrawals': recent_withdrawals,
-        'conversion_rate': getattr(settings, 'LOCAL_PAYMENT_CONVERSION_RATE', 1600),
-        'available_balance': request.user.profile.withdrawable_balance,
-    }
-    return render(request, 'crypto/local_withdrawal.html', ctx)
-
-
-@csrf_exempt
-def paystack_callback_view(request):
-    """Handle Paystack webhook callbacks and redirects"""
-    if request.method == 'POST':
-        # Handle webhook (POST request)
-        import json
-        from crypto.paystack_service import PaystackWebhookHandler
-        
-        try:
-            # Log incoming webhook
-            payload = json.loads(request.body)
-            signature = request.headers.get('x-paystack-signature', '')
-            
-            print(f"DEBUG: Paystack webhook received")
-            print(f"DEBUG: Event: {payload.get('event', 'unknown')}")
-            print(f"DEBUG: Reference: {payload.get('data', {}).get('reference', 'unknown')}")
-            print(f"DEBUG: Signature: {signature[:20]}..." if signature else "DEBUG: No signature")
-            
-            # Verify webhook signature (implement proper verification in production)
-            if not PaystackWebhookHandler.verify_webhook_signature(request.body, signature):
-                print("DEBUG: Webhook signature verification failed")
-                return JsonResponse({'status': 'error', 'message': 'Invalid signature'}, status=401)
-            
-            event = payload.get('event', '')
-            print(f"DEBUG: Processing webhook event: {event}")
-            
-            if event == 'charge.success':
-                success, message = PaystackWebhookHandler.handle_charge_success(payload)
-                print(f"DEBUG: Charge success result: {success} - {message}")
-                return JsonResponse({'status': 'success' if success else 'error', 'message': message})
-            
-            elif event == 'transfer.success':
-                success, message = PaystackWebhookHandler.handle_transfer_success(payload)
-                print(f"DEBUG: Transfer success result: {success} - {message}")
-                return JsonResponse({'status': 'success' if success else 'error', 'message': message})
-            
-            elif event == 'transfer.failed':
-                success, message = PaystackWebhookHandler.handle_transfer_failed(payload)
-                print(f"DEBUG: Transfer failed result: {success} - {message}")
-                return JsonResponse({'status': 'success' if success else 'error', 'message': message})
-            
-            else:
-                print(f"DEBUG: Unhandled webhook event: {event}")
-                return JsonResponse({'status': 'success', 'message': f'Event {event} received'})
-                
-        except json.JSONDecodeError as e:
-            print(f"DEBUG: JSON decode error: {e}")
-            return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
-        except Exception as e:
-            print(f"DEBUG: Webhook processing error: {e}")
-            import traceback
-            traceback.print_exc()
-            return JsonResponse({'status': 'error', 'message': 'Processing error'}, status=500)
-    
-    elif request.method == 'GET':
-        # Handle Paystack redirect after payment (GET request)
-        reference = request.GET.get('reference', '')
-        print(f"DEBUG: Paystack redirect received with reference: {reference}")
-        
-        if reference:
-            try:
-                from crypto.models import LocalDeposit
-                from crypto.paystack_service import PaystackService
-                
-                deposit = LocalDeposit.objects.get(paystack_reference=reference)
-                
-                # Verify transaction with Paystack
-                verification_response = PaystackService.verify_transaction(reference)
-                
-                if verification_response.get('status') and verification_response['data']['status'] == 'success':
-                    deposit.status = 'paid'
-                    deposit.paystack_response = verification_response
-                    deposit.save()
-                    
-                    # Add funds to user's locked balance
-                    profile = deposit.user.profile
-                    profile.locked_balance += deposit.amount_usdt
-                    profile.save(update_fields=['locked_balance'])
-                    
-                    # Update user rank
-                    profile.update_rank()
-                    
-                    print(f"DEBUG: Payment verified successfully for reference: {reference}")
-                    print(f"DEBUG: User balance updated: +${deposit.amount_usdt}")
-                    
-                    # Redirect back to finance page with success message
-                    from django.contrib import messages
-                    messages.success(request, f"Deposit of ${deposit.amount_usdt} confirmed and added to your account!")
-                    return redirect('crypto:finance')
-                else:
-                    deposit.status = 'failed'
-                    deposit.paystack_response = verification_response
-                    deposit.save()
-                    
-                    print(f"DEBUG: Payment verification failed for reference: {reference}")
-                    
-                    from django.contrib import messages
-                    messages.error(request, "Payment verification failed. Please contact support.")
-                    return redirect('crypto:finance')
-                    
-            except LocalDeposit.DoesNotExist:
-                print(f"DEBUG: Invalid payment reference: {reference}")
-                from django.contrib import messages
-                messages.error(request, "Invalid payment reference")
-                return redirect('crypto:finance')
-            except Exception as e:
-                print(f"DEBUG: Error processing redirect: {e}")
-                from django.contrib import messages
-                messages.error(request, "Error processing payment verification")
-                return redirect('crypto:finance')
-        else:
-            print(f"DEBUG: No reference provided in redirect")
-            from django.contrib import messages
-            messages.error(request, "No payment reference provided")
-            return redirect('crypto:finance')
-    
-    else:
-        print(f"DEBUG: Webhook received with method: {request.method}")
-        return JsonResponse({'status': 'error', 'message': 'Invalid request method'}, status=400)
-
-
-@login_required(login_url='crypto:login')
-def paystack_verify_view(request):
-    """Verify Paystack payment after redirect"""
-    reference = request.GET.get('reference', '')
-    if not reference:
-        messages.error(request, "No payment reference provided")
-        return redirect('crypto:local_deposit')
-    
-    from crypto.models import LocalDeposit
-    from crypto.paystack_service import PaystackService
-    
-    try:
-        deposit = LocalDeposit.objects.get(paystack_reference=reference)
-        
-        # Verify transaction with Paystack
-        verification_response = PaystackService.verify_transaction(reference)
-        
-        if verification_response.get('status') and verification_response['data']['status'] == 'success':
-            deposit.status = 'paid'
-            deposit.paystack_response = verification_response
-            deposit.save()
-            
-            # Add funds to user's locked balance
-            profile = deposit.user.profile
-            profile.locked_balance += deposit.amount_usdt
-            profile.save(update_fields=['locked_balance'])
-            
-            # Update user rank
-            profile.update_rank()
-            
-            messages.success(request, f"Deposit of ${deposit.amount_usdt} confirmed and added to your account!")
-        else:
-            deposit.status = 'failed'
-            deposit.paystack_response = verification_response
-            deposit.save()
-            messages.error(request, "Payment verification failed. Please contact support.")
-    
-    except LocalDeposit.DoesNotExist:
-        messages.error(request, "Invalid payment reference")
-    
-    return redirect('crypto:local_deposit')
-
-# =============================================================================
-# Referral / Promos
-# =============================================================================
-
-@login_required(login_url='crypto:login')
-def referral_view(request):
-    if request.user.is_banned:
-        return redirect('crypto:login')
-    profile = get_object_or_404(Profile, user=request.user)
-    form = PromoRedeemForm(request.POST or None)
-    if request.method == 'POST' and form.is_valid():
-        code = form.cleaned_data['code'].strip()
-        promo = PromoCode.objects.filter(code=code, status='active').first()
-        if not promo:
-            messages.error(request, 'Invalid or expired promo code.')
-            return redirect('crypto:referral')
-        if promo.expiration and promo.expiration < timezone.now():
-            messages.error(request, 'Promo code expired.')
-            return redirect('crypto:referral')
-        if promo.usage_limit is not None and (promo.usage_count or 0) >= promo.usage_limit:
-            messages.error(request, 'Usage limit reached.')
-            return redirect('crypto:referral')
-        if PromoRedemption.objects.filter(user=request.user, promo_code=promo).exists():
-            messages.error(request, 'Already redeemed.')
-            return redirect('crypto:referral')
-        bonus = promo.bonus_min + (promo.bonus_max - promo.bonus_min) * Decimal(str(random.random()))
-        
-        # Create a deposit entry for the promo bonus with 30-day expiration
-        expires_at = timezone.now() + timedelta(days=30)
-        
-        # Create deposit record for the promo bonus
-        Deposit.objects.create(
-            user=request.user,
-            amount=bonus,
-            network='PROMO',
-            wallet_address='PROMO_BONUS',
-            status='approved',
-            expires_at=expires_at,
-            approved_at=timezone.now()
-        )
-        
-        # Add to locked balance (same as before)
-        profile.locked_balance += bonus
-        profile.save(update_fields=['locked_balance'])
-        
-        # Create promo redemption record
-        PromoRedemption.objects.create(user=request.user, promo_code=promo, bonus_amount=bonus)
-        promo.usage_count = (promo.usage_count or 0) + 1
-        promo.save(update_fields=['usage_count'])
-        
-        # Update rank after promo redemption
-        profile.update_rank()
-        messages.success(request, f'Promo redeemed. Bonus ${bonus:.2f} credited (expires in 30 days).')
-        return redirect('crypto:referral')
-    ctx = {'profile': profile, 'form': form}
-    return render(request, 'crypto/referral.html', ctx)
-
-# =============================================================================
-# Admin
-# =============================================================================
-
-# --- Dashboard ---
-@login_required(login_url='crypto:login')
-@admin_required
-def admin_dashboard_view(request):
-    from crypto.models import LocalDeposit, LocalWithdrawal
-    total_users = User.objects.filter(is_staff=False).count()
-    
-    # Include both crypto and Paystack deposits
-    crypto_deposits = Deposit.objects.filter(status='approved').aggregate(s=Sum('amount'))['s'] or Decimal('0')
-    local_deposits = LocalDeposit.objects.filter(status='paid').aggregate(s=Sum('amount_usdt'))['s'] or Decimal('0')
-    total_deposits = crypto_deposits + local_deposits
-    
-    total_withdrawals = Withdrawal.objects.filter(status='approved').aggregate(s=Sum('amount'))['s'] or Decimal('0')
-    local_withdrawals = LocalWithdrawal.objects.filter(status='completed').aggregate(s=Sum('amount_usdt'))['s'] or Decimal('0')
-    total_withdrawals = total_withdrawals + local_withdrawals
-    
-    # Include both crypto and Paystack pending deposits
-    pending_crypto_deposits = Deposit.objects.filter(status='pending').count()
-    pending_local_deposits = LocalDeposit.objects.filter(status='pending').count()
-    pending_deposits = pending_crypto_deposits + pending_local_deposits
-    
-    pending_withdrawals = Withdrawal.objects.filter(status='pending_admin_approval').count()
-    pending_local_withdrawals = LocalWithdrawal.objects.filter(status='pending_admin_approval').count()
-    pending_withdrawals = pending_withdrawals + pending_local_withdrawals
-    
-    # Calculate total user balances
-    total_locked_balance = Profile.objects.aggregate(s=Sum('locked_balance'))['s'] or Decimal('0')
-    total_withdrawable_balance = Profile.objects.aggregate(s=Sum('withdrawable_balance'))['s'] or Decimal('0')
-    
-    ctx = {
-        'total_users': total_users,
-        'total_deposits': total_deposits,
-        'total_withdrawals': total_withdrawals,
-        'pending_deposits': pending_deposits,
-        'pending_withdrawals': pending_withdrawals,
-        'total_locked_balance': total_locked_balance,
-        'total_withdrawable_balance': total_withdrawable_balance,
-        'crypto_deposits': crypto_deposits,
-        'local_deposits': local_deposits,
-    }
-    return render(request, 'crypto/admin/dashboard.html', ctx)
-
-# --- Deposits ---
-@login_required(login_url='crypto:login')
-@admin_required
-def admin_deposits_view(request):
-    status = request.GET.get('status')
-    deposit_type = request.GET.get('type', 'all')
-    
-    # Get both crypto and Paystack deposits
-    crypto_deposits = Deposit.objects.select_related('user').order_by('-created_at')
-    local_deposits = LocalDeposit.objects.select_related('user').order_by('-created_at')
-    
-    # Filter by status
-    if status:
-        if status == 'pending':
-            crypto_deposits = crypto_deposits.filter(status='pending')
-            local_deposits = local_deposits.filter(status='pending')
-        elif status == 'approved':
-            crypto_deposits = crypto_deposits.filter(status='approved')
-            local_deposits = local_deposits.filter(status='paid')
-        elif status == 'rejected':
-            crypto_deposits = crypto_deposits.filter(status='rejected')
-            local_deposits = local_deposits.filter(status='failed')
-    
-    # Filter by type
-    if deposit_type == 'crypto':
-        local_deposits = LocalDeposit.objects.none()
-    elif deposit_type == 'paystack':
-        crypto_deposits = Deposit.objects.none()
-    
-    # Combine and sort
-    all_deposits = []
-    
-    # Add crypto deposits
-    for deposit in crypto_deposits:
-        all_deposits.append({
-            'pk': deposit.id,  # Use 'pk' instead of 'id' for template compatibility
-            'id': deposit.id,
-            'user': deposit.user,
-            'amount': deposit.amount,
-            'type': 'crypto',
-            'network': deposit.network,
-            'wallet_address': deposit.wallet_address,
-            'status': deposit.status,
-            'created_at': deposit.created_at,
-            'approved_at': deposit.approved_at,
-            'referrer': deposit.referrer,
-        })
-    
-    # Add Paystack deposits
-    for deposit in local_deposits:
-        all_deposits.append({
-            'pk': deposit.id,  # Use 'pk' instead of 'id' for template compatibility
-            'id': deposit.id,
-            'user': deposit.user,
-            'amount': deposit.amount_usdt,
-            'type': 'paystack',
-            'network': f'Paystack NGN (₦{deposit.amount_ngn:.2f})',
-            'wallet_address': deposit.paystack_reference,
-            'status': 'paid' if deposit.status == 'paid' else deposit.status,
-            'created_at': deposit.created_at,
-            'approved_at': deposit.paid_at,
-            'referrer': deposit.referrer,
-        })
-    
-    # Sort by created_at
-    all_deposits.sort(key=lambda x: x['created_at'], reverse=True)
-    
-    return render(request, 'crypto/admin/deposits.html', {'deposits': all_deposits})
-
-@login_required(login_url='crypto:login')
-@admin_required
-@require_POST
-def admin_deposit_approve_view(request, pk):
-    # Try to find deposit in both models
-    try:
-        # First try crypto deposit
-        d = get_object_or_404(Deposit, pk=pk)
-        deposit_type = 'crypto'
-    except:
-        # Then try Paystack deposit
-        d = get_object_or_404(LocalDeposit, pk=pk)
-        deposit_type = 'paystack'
-    
-    # Check if deposit can be approved
-    if deposit_type == 'crypto' and d.status != 'pending':
-        messages.warning(request, "Crypto deposit is not pending.")
-        return redirect('crypto:admin_deposits')
-    elif deposit_type == 'paystack' and d.status != 'pending':
-        messages.warning(request, "Paystack deposit is not pending.")
-        return redirect('crypto:admin_deposits')
-    
-    profile = get_object_or_404(Profile, user=d.user)
-    
-    if deposit_type == 'crypto':
-        # Handle crypto deposit approval
-        profile.locked_balance += d.amount
-        d.status = 'approved'
-        d.approved_at = timezone.now()
-        d.expires_at = d.expires_at or add_days(timezone.now(), LOCK_DAYS)
-        d.save(update_fields=['status', 'approved_at', 'expires_at'])
-        
-        # Referral bonus for crypto deposit
-        if d.referrer_id and d.referrer_id != d.user_id:
-            bonus = d.amount * REFERRAL_PCT
-            ref_profile = Profile.objects.filter(user_id=d.referrer_id).first()
-            if ref_profile:
-                ref_profile.locked_balance += bonus
-                ref_profile.total_referrals += 1
-                ref_profile.valid_referrals += 1
-                ref_profile.referral_earnings += bonus
-                ref_profile.save()
-                Referral.objects.create(referrer_id=d.referrer_id, referee=d.user, bonus_amount=bonus, deposit=d)
-                ref_profile.update_rank()
-        
-        messages.success(request, f"Crypto deposit {d.amount} approved.")
-        
-    else:
-        # Handle Paystack deposit approval (manual approval for pending deposits)
-        profile.locked_balance += d.amount_usdt
-        d.status = 'paid'  # Change to 'paid' for consistency with webhook
-        d.paid_at = timezone.now()
-        d.save(update_fields=['status', 'paid_at'])
-        
-        # TODO: Implement referral logic for Paystack deposits if needed
-        # For now, skip referral processing to avoid AttributeError
-        
-        messages.success(request, f"Paystack deposit {d.amount_usdt} approved.")
-    
-    # Update user rank
-    profile.save(update_fields=['locked_balance'])
-    profile.update_rank()
-    
-    return redirect('crypto:admin_deposits')
-
-@login_required(login_url='crypto:login')
-@admin_required
-@require_POST
-def admin_deposit_reject_view(request, pk):
-    # Try to find deposit in both models
-    try:
-        # First try crypto deposit
-        d = get_object_or_404(Deposit, pk=pk)
-        deposit_type = 'crypto'
-    except:
-        # Then try Paystack deposit
-        d = get_object_or_404(LocalDeposit, pk=pk)
-        deposit_type = 'paystack'
-    
-    # Check if deposit can be rejected
-    if deposit_type == 'crypto' and d.status != 'pending':
-        messages.warning(request, "Crypto deposit is not pending.")
-        return redirect('crypto:admin_deposits')
-    elif deposit_type == 'paystack' and d.status != 'pending':
-        messages.warning(request, "Paystack deposit is not pending.")
-        return redirect('crypto:admin_deposits')
-    
-    if deposit_type == 'crypto':
-        # Handle crypto deposit rejection
-        d.status = 'rejected'
-        d.approved_at = timezone.now()  # Use approved_at field for processing timestamp
-        d.save(update_fields=['status', 'approved_at'])
-        messages.success(request, f"Crypto deposit {d.amount} rejected.")
-        
-    else:
-        # Handle Paystack deposit rejection
-        d.status = 'failed'
-        d.save(update_fields=['status'])
-        messages.success(request, f"Paystack deposit {d.amount_usdt} rejected.")
-    
-    return redirect('crypto:admin_deposits')
-
-# --- Withdrawals ---
-@login_required(login_url='crypto:login')
-@admin_required
-def admin_withdrawals_view(request):
-    status = request.GET.get('status')
-    qs = Withdrawal.objects.select_related('user').order_by('-created_at')
-    if status:
-        qs = qs.filter(status=status)
-    return render(request, 'crypto/admin/withdrawals.html', {'withdrawals': qs})
-
-@login_required(login_url='crypto:login')
-@admin_required
-@require_POST
-def admin_withdrawal_approve_view(request, pk):
-    w = get_object_or_404(Withdrawal, pk=pk)
-    if w.status not in ['pending', 'pending_admin_approval']:
-        messages.warning(request, "Withdrawal is not pending.")
-        return redirect('crypto:admin_withdrawals')
-    w.status = 'approved'
-    w.processed_at = timezone.now()
-    w.save(update_fields=['status', 'processed_at'])
-    messages.success(request, f"Withdrawal {w.amount} approved.")
-    return redirect('crypto:admin_withdrawals')
-
-@login_required(login_url='crypto:login')
-@admin_required
-@require_POST
-def admin_withdrawal_reject_view(request, pk):
-    w = get_object_or_404(Withdrawal, pk=pk)
-    if w.status not in ['pending', 'pending_admin_approval']:
-        messages.warning(request, "Withdrawal is not pending.")
-        return redirect('crypto:admin_withdrawals')
-    
-    # Refund the amount back to user's withdrawable balance
-    profile = get_object_or_404(Profile, user=w.user)
-    profile.withdrawable_balance += w.amount
-    profile.save(update_fields=['withdrawable_balance'])
-    
-    w.status = 'rejected'
-    w.processed_at = timezone.now()
-    w.save(update_fields=['status', 'processed_at'])
-    
-    messages.success(request, f"Withdrawal {w.amount} rejected and refunded.")
-    return redirect('crypto:admin_withdrawals')
-
-# --- Local Withdrawals ---
-@login_required(login_url='crypto:login')
-@admin_required
-def admin_local_withdrawals_view(request):
-    """Admin view to manage local withdrawal requests"""
-    from crypto.models import LocalWithdrawal
-    status = request.GET.get('status')
-    qs = LocalWithdrawal.objects.select_related('user').order_by('-created_at')
-    if status:
-        qs = qs.filter(status=status)
-    return render(request, 'crypto/admin/local_withdrawals.html', {'withdrawals': qs})
-
-@login_required(login_url='crypto:login')
-@admin_required
-@require_POST
-def admin_local_withdrawal_approve_view(request, pk):
-    """Approve a local withdrawal and process via Paystack"""
-    from crypto.models import LocalWithdrawal
-    from crypto.paystack_service import PaystackService
-    w = get_object_or_404(LocalWithdrawal, pk=pk)
-    if w.status != 'pending_admin_approval':
-        messages.warning(request, "Local withdrawal is not pending.")
-        return redirect('crypto:admin_local_withdrawals')
-    
-    # Change status to approved first
-    w.status = 'approved'
-    w.processed_at = timezone.now()
-    w.processed_by = request.user
-    w.save(update_fields=['status', 'processed_at', 'processed_by'])
-    
-    # Process Paystack transfer automatically
-    try:
-        # Create transfer recipient
-        recipient_response = PaystackService.create_transfer_recipient(
-            account_number=w.account_number,
-            bank_code=w.get_bank_code(),  # We'll need to add this method
-            account_name=w.account_holder_name,
-            description=f"Withdrawal for {w.user.email}"
-        )
-        
-        if recipient_response.get('status'):
-            recipient_code = recipient_response['data']['recipient_code']
-            
-            # Initiate transfer
-            transfer_response = PaystackService.initiate_transfer(
-                amount=float(w.amount_ngn),
-                recipient_code=recipient_code,
-                reason=f"CopyBloom FX Withdrawal - {w.user.email}"
-            )
-            
-            if transfer_response.get('status'):
-                w.paystack_transfer_reference = transfer_response['data']['reference']
-                w.paystack_response = transfer_response
-                w.save(update_fields=['paystack_transfer_reference', 'paystack_response'])
-                
-                messages.success(request, f"Local withdrawal of ${w.amount_usdt} approved and Paystack transfer initiated. Reference: {transfer_response['data']['reference']}")
-            else:
-                messages.error(request, f"Failed to initiate Paystack transfer: {transfer_response.get('message', 'Unknown error')}")
-        else:
-            messages.error(request, f"Failed to create Paystack recipient: {recipient_response.get('message', 'Unknown error')}")
-            
-    except Exception as e:
-        messages.error(request, f"Error processing Paystack transfer: {str(e)}")
-    
-    return redirect('crypto:admin_local_withdrawals')
-
-@login_required(login_url='crypto:login')
-@admin_required
-@require_POST
-def admin_local_withdrawal_reject_view(request, pk):
-    """Reject a local withdrawal and refund user balance"""
-    from crypto.models import LocalWithdrawal
-    w = get_object_or_404(LocalWithdrawal, pk=pk)
-    if w.status != 'pending_admin_approval':
-        messages.warning(request, "Local withdrawal is not pending.")
-        return redirect('crypto:admin_local_withdrawals')
-    
-    # Refund the amount back to user's withdrawable balance
-    profile = get_object_or_404(Profile, user=w.user)
-    profile.withdrawable_balance += w.amount_usdt
-    profile.save(update_fields=['withdrawable_balance'])
-    
-    # Update withdrawal status
-    w.status = 'rejected'
-    w.processed_at = timezone.now()
-    w.save(update_fields=['status', 'processed_at'])
-    
-    messages.success(request, f"Local withdrawal of ${w.amount_usdt} rejected and refunded.")
-    return redirect('crypto:admin_local_withdrawals')
-
-@login_required(login_url='crypto:login')
-@admin_required
-@require_POST
-def admin_local_withdrawal_complete_view(request, pk):
-    """Mark a local withdrawal as completed after Paystack processing"""
-    from crypto.models import LocalWithdrawal
-    w = get_object_or_404(LocalWithdrawal, pk=pk)
-    if w.status != 'approved':
-        messages.warning(request, "Local withdrawal must be approved first.")
-        return redirect('crypto:admin_local_withdrawals')
-    
-    # Mark as completed
-    w.status = 'completed'
-    w.completed_at = timezone.now()
-    w.save(update_fields=['status', 'completed_at'])
-    
-    messages.success(request, f"Local withdrawal of ${w.amount_usdt} marked as completed.")
-    return redirect('crypto:admin_local_withdrawals')
-
-# --- Users ---
-@login_required(login_url='crypto:login')
-@admin_required
-def admin_users_view(request):
-    flt = request.GET.get('filter')
-    qs = User.objects.filter(is_staff=False).order_by('-id')[:200]
-    if flt == 'flagged':
-        qs = qs.filter(is_flagged=True)
-    elif flt == 'banned':
-        qs = qs.filter(is_banned=True)
-    return render(request, 'crypto/admin/users.html', {'users': qs})
-
-@login_required(login_url='crypto:login')
-@admin_required
-@require_POST
-def admin_user_flag_view(request, pk):
-    u = get_object_or_404(User, pk=pk)
-    if u.is_staff:
-        messages.error(request, "Cannot flag admin.")
-        return redirect('crypto:admin_users')
-    u.is_flagged = True
-    u.save(update_fields=['is_flagged'])
-    messages.success(request, "User flagged.")
-    return redirect('crypto:admin_users')
-
-@login_required(login_url='crypto:login')
-@admin_required
-@require_POST
-def admin_user_unflag_view(request, pk):
-    u = get_object_or_404(User, pk=pk)
-    u.is_flagged = False
-    u.save(update_fields=['is_flagged'])
-    messages.success(request, "User unflagged.")
-    return redirect('crypto:admin_users')
-
-@login_required(login_url='crypto:login')
-@admin_required
-@require_POST
-def admin_user_ban_view(request, pk):
-    u = get_object_or_404(User, pk=pk)
-    if u.is_staff:
-        messages.error(request, "Cannot ban admin.")
-        return redirect('crypto:admin_users')
-    u.is_banned = True
-    u.is_flagged = True
-    u.save(update_fields=['is_banned', 'is_flagged'])
-    messages.success(request, "User banned.")
-    return redirect('crypto:admin_users')
-
-@login_required(login_url='crypto:login')
-@admin_required
-@require_POST
-def admin_user_unban_view(request, pk):
-    u = get_object_or_404(User, pk=pk)
-    u.is_banned = False
-    u.save(update_fields=['is_banned'])
-    messages.success(request, "User unbanned.")
-    return redirect('crypto:admin_users')
-
-# --- Promo codes ---
-@login_required(login_url='crypto:login')
-@admin_required
-def admin_promos_view(request):
-    promos = PromoCode.objects.order_by('-created_at')
-    redemptions = PromoRedemption.objects.select_related('user', 'promo_code').order_by('-created_at')[:100]
-    form = PromoCodeCreateForm(request.POST or None)
-    if request.method == 'POST' and form.is_valid():
-        form.save()
-        messages.success(request, "Promo created.")
-        return redirect('crypto:admin_promos')
-    return render(request, 'crypto/admin/promos.html', {'promos': promos, 'redemptions': redemptions, 'form': form})
-
-@login_required(login_url='crypto:login')
-@admin_required
-@require_POST
-def admin_promo_toggle_view(request, pk):
-    p = get_object_or_404(PromoCode, pk=pk)
-    p.status = 'disabled' if p.status == 'active' else 'active'
-    p.save(update_fields=['status'])
-    messages.success(request, f"Promo {p.status}.")
-    return redirect('crypto:admin_promos')
+# =============================================================================
+# crypto/views.py
+# Fully merged version — all user, dashboard, finance, profile, referral, and admin views
+# =============================================================================
+# pyright: reportMissingImports=false
+
+import copy
+import heapq
+import json
+import logging
+import random
+import secrets
+import time
+from decimal import Decimal
+from functools import lru_cache
+from types import SimpleNamespace
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth import login, logout, get_user_model
+from django.contrib.auth.decorators import login_required
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import IntegrityError, transaction
+from django.http import Http404, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods, require_POST, require_GET
+from django.db.models import CharField, Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from datetime import datetime, timedelta
+
+from .models import (
+    Deposit, Withdrawal, PromoCode, PromoRedemption, CopyTrade,
+    Profile, Referral, CustomUser as User, DailyReward, DailyProfit, DailyFinanceRollup, LocalDeposit, LocalWithdrawal, Notification,
+    finance_overview_key, FINANCE_OVERVIEW_TTL, ranks_by_min_balance,
+    ADMIN_DASHBOARD_KEY, ADMIN_DASHBOARD_TTL,
+)
+from .rank_utils import (
+    calculate_user_rank, update_user_rank, generate_daily_profit, 
+    get_copy_trade_limit, can_execute_copy_trade, get_concurrent_copy_trades,
+    is_copy_trade_limit_reached
+)
+from .forms import (
+    SignupForm, LoginForm, ProfileUpdateForm, DepositForm, WithdrawalForm,
+    PromoRedeemForm, PromoCodeCreateForm, LocalDepositForm, LocalWithdrawalForm
+)
+from .tasks import MULTI_ACCOUNT_LAST_FLAGGED_KEY, detect_multiple_accounts_if_due, tick_trades_if_due
+from .utils import (
+    add_days, REFERRAL_PCT, PAIRS, LOCK_DAYS, get_client_ip, get_random_wallet, get_available_wallet,
+    start_of_day, NETWORKS, MIN_DEPOSIT, MIN_WITHDRAWAL, DAILY_REWARD
+)
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+# Settings read per request; they don't change while the process runs
+LOCAL_PAYMENT_CONVERSION_RATE = getattr(settings, 'LOCAL_PAYMENT_CONVERSION_RATE', 1600)
+PAYSTACK_CALLBACK_URL = getattr(settings, 'PAYSTACK_CALLBACK_URL', 'http://127.0.0.1:8000/paystack/callback/')
+
+@csrf_exempt
+@require_http_methods(["GET"])
+@login_required(login_url='crypto:login')
+def check_deposit_status_view(request):
+    """API endpoint to check deposit status in real-time"""
+    deposit_id = request.GET.get('deposit_id')
+    deposit_type = request.GET.get('deposit_type', 'crypto')
+    
+    if not deposit_id:
+        return JsonResponse({'error': 'Deposit ID required'}, status=400)
+    
+    if deposit_type == 'local':
+        # Check LocalDeposit status
+        model, approved_status, rejected_status = LocalDeposit, 'paid', 'failed'
+    else:
+        # Check crypto Deposit status
+        model, approved_status, rejected_status = Deposit, 'approved', 'rejected'
+    
+    try:
+        # Only the status column is needed for this polled endpoint
+        status = model.objects.filter(id=deposit_id, user=request.user).values_list('status', flat=True).first()
+    except ValueError:
+        return JsonResponse({'error': 'Invalid deposit ID'}, status=400)
+    
+    if status is None:
+        return JsonResponse({'error': 'Deposit not found'}, status=404)
+    
+    return JsonResponse({
+        'status': status,
+        'approved': status == approved_status,
+        'rejected': status == rejected_status
+    })
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@login_required(login_url='crypto:login')
+def clear_deposit_session_view(request):
+    """API endpoint to clear deposit session data after approval"""
+    try:
+        # Clear the last_deposit session data; SessionMiddleware saves it
+        # with the response
+        request.session.pop('last_deposit', None)
+        
+        return JsonResponse({'success': True, 'message': 'Session cleared successfully'})
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+def test_webhook_view(request):
+    """Test endpoint to simulate Paystack webhooks"""
+    if request.method == 'GET':
+        # Show test form
+        return JsonResponse({
+            'message': 'Send POST request to test webhook',
+            'example_payload': {
+                'event': 'charge.success',
+                'data': {
+                    'reference': 'TEST_REF_123',
+                    'status': 'success',
+                    'amount': 10000,  # 100 NGN in kobo
+                    'customer': {
+                        'email': 'test@example.com'
+                    }
+                }
+            }
+        })
+    
+    elif request.method == 'POST':
+        # Simulate webhook
+        from crypto.paystack_service import PaystackWebhookHandler
+        
+        try:
+            payload = json.loads(request.body)
+            event = payload.get('event', '')
+            
+            if event == 'charge.success':
+                success, message = _handle_paystack_settlement(event, PaystackWebhookHandler.handle_charge_success, payload)
+                return JsonResponse({
+                    'success': success,
+                    'message': message,
+                    'payload': payload
+                })
+            else:
+                return JsonResponse({
+                    'success': False,
+                    'message': f'Unsupported event: {event}'
+                })
+                
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=500)
+
+@require_http_methods(["GET"])
+def webhook_status_view(request):
+    """Check webhook endpoint status"""
+    return JsonResponse({
+        'webhook_url': 'http://127.0.0.1:8000/paystack/callback/',
+        'status': 'active',
+        'test_endpoint': 'http://127.0.0.1:8000/test-webhook/',
+        'instructions': [
+            '1. For local testing, use ngrok to expose your localhost',
+            '2. Set webhook URL in Paystack dashboard to: https://your-ngrok-url.ngrok.io/paystack/callback/',
+            '3. Test with: POST to /test-webhook/ with sample payload',
+            '4. Check server logs for DEBUG messages'
+        ]
+    })
+
+PAYSTACK_DIAG_CACHE_KEY = 'paystack_diag_v1'
+PAYSTACK_DIAG_TTL = 60  # seconds
+
+
+@lru_cache(maxsize=1)
+def _paystack_config_status():
+    """Key configuration summary; settings don't change while the process runs"""
+    
+    secret_key = getattr(settings, 'PAYSTACK_SECRET_KEY', '')
+    public_key = getattr(settings, 'PAYSTACK_PUBLIC_KEY', '')
+    
+    return {
+        'secret_key_configured': bool(secret_key and secret_key != 'sk_test_your_secret_key_here'),
+        'public_key_configured': bool(public_key and public_key != 'pk_test_your_public_key_here'),
+        'secret_key_prefix': secret_key[:8] if secret_key else 'Not set',
+        'public_key_prefix': public_key[:8] if public_key else 'Not set',
+    }
+
+
+def _paystack_diagnostics(request, email, caller):
+    """Config status plus a test transaction, reusing a recent result.
+
+    Results are cached per ``caller`` ('public' or 'user'), since the two
+    views test with different emails; only staff may force a fresh call
+    with ?refresh=1.
+    """
+    from crypto.paystack_service import PaystackService
+    
+    cache_key = f'{PAYSTACK_DIAG_CACHE_KEY}:{caller}'
+    user = request.user
+    refresh = (request.GET.get('refresh') == '1' and user.is_authenticated
+               and (user.is_staff or user.has_admin_access))
+    test_result = None if refresh else cache.get(cache_key)
+    if test_result is None:
+        # Test API connectivity
+        test_result = PaystackService.initialize_transaction(
+            amount=100,  # 100 NGN (small test amount)
+            email=email,
+            callback_url=getattr(settings, 'PAYSTACK_CALLBACK_URL', ''),
+            reference=f"TEST_{secrets.token_hex(4)}"
+        )
+        cache.set(cache_key, test_result, PAYSTACK_DIAG_TTL)
+    
+    return JsonResponse({
+        'config_status': _paystack_config_status(),
+        'test_result': test_result,
+        'is_working': test_result.get('status', False),
+        'message': 'Paystack is working!' if test_result.get('status') else 'Paystack configuration needs attention'
+    })
+
+@require_http_methods(["GET"])
+def public_test_paystack_view(request):
+    """Public Paystack configuration test (no login required)"""
+    return _paystack_diagnostics(request, 'test@example.com', 'public')
+
+@csrf_exempt
+@require_http_methods(["GET"])
+@login_required(login_url='crypto:login')
+def test_paystack_view(request):
+    """Test Paystack configuration and connectivity"""
+    return _paystack_diagnostics(request, request.user.email, 'user')
+
+@login_required(login_url='crypto:login')
+def paystack_test_page_view(request):
+    """Paystack test page"""
+    return render(request, 'crypto/paystack_test.html')
+
+# =============================================================================
+# Helper functions
+# =============================================================================
+
+def admin_required(view_func):
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated or not request.user.has_admin_access:
+            messages.error(request, 'You are not authorized to access this page.')
+            return redirect('crypto:login')
+        return view_func(request, *args, **kwargs)
+    return wrapper
+
+def _flag_if_multi_account(user, ip):
+    """Flag user and their matches when 2+ other accounts share the IP or phone"""
+    phone = getattr(user, 'phone', None)
+    q = Q()
+    if ip:
+        q |= Q(last_login_ip=ip)
+    if phone:
+        q |= Q(phone=phone)
+    if not q:
+        return False
+    matched = User.objects.filter(q).exclude(role='admin')
+    # Only need to know whether there are at least two others, not how many
+    if len(matched.exclude(pk=user.pk).values_list('pk', flat=True)[:2]) < 2:
+        return False
+    matched.filter(is_flagged=False).update(is_flagged=True)
+    if user.role != 'admin':
+        user.is_flagged = True
+    return True
+
+def _get_profile(user):
+    """The user's profile through the reverse one-to-one, cached on the user instance"""
+    try:
+        return user.profile
+    except Profile.DoesNotExist:
+        raise Http404('Profile not found')
+
+def _update_user_rank(user, profile=None):
+    """Update user rank based on principal balance only"""
+    if profile is None:
+        profile = getattr(user, 'profile', None)
+    if profile is None:
+        return None
+    return profile.update_rank()
+
+def calculate_daily_profit(user, profile=None):
+    """Calculate daily profit for user - idempotent, once per day"""
+    if profile is None:
+        profile = getattr(user, 'profile', None)
+    if profile is None:
+        return None
+    
+    # Safety invariants
+    if profile.locked_balance <= 0:
+        return None
+    
+    rank = profile.get_rank()
+    if not rank:
+        return None
+    
+    daily_profit_amount = (profile.locked_balance * (rank.daily_profit_percentage / Decimal('100'))).quantize(Decimal('0.01'))
+    
+    if daily_profit_amount <= 0:
+        return None
+    
+    with transaction.atomic():
+        # The (user, date) unique constraint lets exactly one caller per day
+        # insert the row; everyone else gets created=False and credits nothing
+        _, created = DailyProfit.objects.get_or_create(
+            user=user, date=timezone.localdate(), defaults={'amount': daily_profit_amount},
+        )
+        if not created:
+            return None
+        # Add profit to withdrawable balance (atomic F() update)
+        profile.adjust_balances(withdrawable_delta=daily_profit_amount)
+    
+    return daily_profit_amount
+
+COPY_TRADES_24H_TTL = 60  # seconds; trades ageing out of the window lag by at most this
+
+def _copy_trades_24h_key(user_id):
+    return f'copy_trades_24h:{user_id}'
+
+def get_concurrent_copy_trades(user):
+    """Get count of copy trades in the last 24 hours"""
+    
+    def count():
+        last_24_hours = timezone.now() - timedelta(hours=24)
+        return CopyTrade.objects.filter(
+            user=user, 
+            created_at__gte=last_24_hours
+        ).count()
+    
+    # Cached briefly and dropped on every new trade. A trade committed while
+    # another request is recounting can still be missed until the entry expires.
+    return cache.get_or_set(_copy_trades_24h_key(user.pk), count, COPY_TRADES_24H_TTL)
+
+def _record_copy_trade(user):
+    cache.delete(_copy_trades_24h_key(user.pk))  # the next read counts from the DB
+
+# =============================================================================
+# Auth
+# =============================================================================
+
+@require_http_methods(['GET', 'POST'])
+def login_view(request):
+    if request.user.is_authenticated:
+        return redirect('crypto:dashboard')
+    form = LoginForm(request, data=request.POST or None)
+    if request.method == 'POST' and form.is_valid():
+        user = form.get_user()
+        if user.is_banned:
+            messages.error(request, 'Account banned.')
+            return redirect('crypto:login')
+        ip = get_client_ip(request)
+        with transaction.atomic():
+            user.last_login_ip = ip
+            user.save(update_fields=['last_login_ip'])
+            _flag_if_multi_account(user, ip)
+        login(request, user)
+        messages.success(request, 'Logged in.')
+        next_url = request.GET.get('next') or 'crypto:dashboard'
+        return redirect(next_url)
+    return render(request, 'crypto/login.html', {'form': form})
+
+@require_http_methods(['GET', 'POST'])
+def signup_view(request):
+    if request.user.is_authenticated:
+        return redirect('crypto:dashboard')
+    form = SignupForm(request.POST or None)
+    if request.method == 'POST' and form.is_valid():
+        ip = get_client_ip(request)
+        if User.objects.filter(last_login_ip=ip, is_banned=True).exists():
+            messages.error(request, 'Access denied.')
+            return redirect('crypto:signup')
+        # User, profile and multi-account flags commit together; login's
+        # session write stays outside
+        with transaction.atomic():
+            user = form.save(commit=False)
+            user.role = 'user'
+            user.save()
+            _flag_if_multi_account(user, ip)
+            Profile.objects.create_with_referral_code(user)
+        # Not authenticated through a backend, and more than one is configured
+        login(request, user, backend='crypto.backends.ProfileModelBackend')
+        messages.success(request, 'Account created.')
+        return redirect('crypto:dashboard')
+    return render(request, 'crypto/signup.html', {'form': form})
+
+@require_GET
+def logout_view(request):
+    logout(request)
+    messages.info(request, 'Logged out.')
+    return redirect('crypto:login')
+
+# Dashboard
+# =============================================================================
+
+@login_required(login_url='crypto:login')
+def dashboard_view(request):
+    if request.user.is_banned:
+        logout(request)
+        return redirect('crypto:login')
+    
+    # Process pending trades and expired deposits, at most once per
+    # TICK_INTERVAL; `manage.py tick_trades` runs the same work off-request
+    tick_trades_if_due()
+    
+    # Run multi-account detection periodically: at most once per
+    # MULTI_ACCOUNT_SCAN_INTERVAL; `manage.py detect_multi_accounts` runs it off-request
+    detect_multiple_accounts_if_due()
+    if request.user.is_staff:
+        # Report each finished scan once per staff session
+        last_scan = cache.get(MULTI_ACCOUNT_LAST_FLAGGED_KEY)
+        if last_scan and last_scan[1] and request.session.get('seen_detection_scan') != last_scan[0]:
+            request.session['seen_detection_scan'] = last_scan[0]
+            messages.info(request, f"Auto-detected and flagged {last_scan[1]} accounts for multi-account abuse.")
+    
+    # TODO: Fix admin redirect after database is properly set up
+    # Temporarily disable admin redirect to avoid loops
+    # if request.user.is_staff or getattr(request.user, 'role', '') == 'admin':
+    #     return redirect('crypto:admin_dashboard')
+    
+    profile = getattr(request.user, 'profile', None)
+    if not profile:
+        # Create profile if it doesn't exist
+        try:
+            profile = Profile.objects.create_with_referral_code(request.user)
+        except Exception:
+            # If profile creation fails, redirect to login
+            return redirect('crypto:login')
+    
+    # Update rank based on current principal balance; the returned rank
+    # comes from the cached ladder, so no extra Rank lookup is needed
+    rank = profile.update_rank()
+    
+    # Calculate daily profit if eligible (only once per day)
+    # Check if profit already calculated for today
+    today = timezone.now().date()
+    
+    # Since DailyProfit model is commented out, we'll use a simple approach
+    # Calculate today's actual profit from copy trades + potential daily profit
+    last_24_hours = timezone.now() - timedelta(hours=24)
+    
+    # Copy trade stats for the last 24 hours and for today (since midnight,
+    # which always falls inside that window) in one conditional aggregate
+    today_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    copy_trade_stats = CopyTrade.objects.filter(
+        user=request.user,
+        created_at__gte=last_24_hours
+    ).aggregate(
+        profit_today=Sum('profit', filter=Q(created_at__gte=today_start)),
+        profit_24h=Sum('profit'),
+        wins_24h=Count('pk', filter=Q(profit__gt=0)),
+        losses_24h=Count('pk', filter=Q(profit__lt=0)),
+    )
+    
+    # Calculate today's actual profit from copy trades
+    copy_trade_profit_today = copy_trade_stats['profit_today'] or Decimal('0')
+    
+    # Calculate potential daily profit from rank
+    if rank and profile.locked_balance > 0 and rank.daily_profit_pct:
+        potential_daily_profit = profile.locked_balance * (Decimal(str(rank.daily_profit_pct)) / Decimal('100'))
+    else:
+        potential_daily_profit = Decimal('0')
+    
+    # Today's total profit = copy trade profit from today
+    daily_profit_amount = copy_trade_profit_today
+    
+    # Use the calculated values
+    todays_potential_profit = potential_daily_profit
+    
+    # Copy trade profit in last 24 hours (separate from today's profit)
+    total_copy_trade_profit_24h = copy_trade_stats['profit_24h'] or Decimal('0')
+    
+    # Count profitable vs loss trades in last 24 hours
+    profitable_trades_24h = copy_trade_stats['wins_24h']
+    loss_trades_24h = copy_trade_stats['losses_24h']
+    
+    # Get copy trade limit safely
+    try:
+        limit = int(rank.max_copy_trades) if rank else 0
+    except (ValueError, AttributeError):
+        try:
+            limit = int(rank.copy_trades_limit) if rank else 0
+        except (ValueError, AttributeError):
+            limit = 5  # Default limit
+    trades = CopyTrade.objects.filter(user=request.user).order_by('-created_at')[: max(limit, 20)]
+    pending_deposits = Deposit.objects.filter(user=request.user, status='pending').order_by('-created_at')
+    # Range predicate on claimed_at so the (user, -claimed_at) index answers it
+    can_claim = not DailyReward.objects.filter(user=request.user, claimed_at__gte=start_of_day()).exists()
+    # Copies of the cached ladder so is_current never leaks between requests
+    ranks = [copy.copy(r) for r in ranks_by_min_balance()]
+    for r in ranks:
+        r.is_current = rank and r.pk == rank.pk
+    
+    ctx = {
+        'profile': profile,
+        'copy_trades': trades,
+        'copy_trades_limit': limit,
+        'pending_deposits': pending_deposits,
+        'can_claim_daily': can_claim,
+        'daily_reward_amount': DAILY_REWARD,
+        'ranks': ranks,
+        'min_withdrawal': MIN_WITHDRAWAL,
+        'todays_profit': daily_profit_amount or Decimal('0'),
+        'todays_potential_profit': todays_potential_profit,
+        'rank': rank,
+        'unread_notifications': Notification.objects.unread_count(request.user.id),
+    }
+    return render(request, 'crypto/dashboard.html', ctx)
+
+@login_required(login_url='crypto:login')
+@require_POST
+def daily_reward_view(request):
+    if request.user.is_banned:
+        return redirect('crypto:login')
+    with transaction.atomic():
+        # Lock the profile so two concurrent claims can't both pass the check
+        profile = get_object_or_404(
+            Profile.objects.select_for_update().only('locked_balance', 'withdrawable_balance', 'rank'), user=request.user
+        )
+        if DailyReward.objects.filter(user=request.user, claimed_at__gte=start_of_day()).exists():
+            messages.warning(request, 'Already claimed today.')
+            return redirect('crypto:dashboard')
+        profile.adjust_balances(withdrawable_delta=DAILY_REWARD)
+        DailyReward.objects.create(user=request.user, amount=DAILY_REWARD)
+        profile.update_rank()
+    messages.success(request, f'Daily reward ${DAILY_REWARD} claimed.')
+    return redirect('crypto:dashboard')
+
+# --------------------------------------------------------------------------
+# Copy trade simulation (user)
+# --------------------------------------------------------------------------
+
+@login_required(login_url='crypto:login')
+@require_POST
+def copy_trade_simulate_view(request):
+    if request.user.is_banned:
+        return redirect('crypto:login')
+    profile = _get_profile(request.user)
+    rank = profile.get_rank()
+    
+    # Safety check: user must have a rank to trade
+    if not rank:
+        messages.warning(request, 'No rank assigned. Cannot execute copy trades.')
+        return redirect('crypto:dashboard')
+    
+    # Check copy trade limit for last 24 hours
+    trades_last_24h = get_concurrent_copy_trades(request.user)
+    # Get max trades allowed safely
+    try:
+        max_trades_allowed = int(rank.max_copy_trades) if rank else 0
+    except (ValueError, AttributeError):
+        try:
+            max_trades_allowed = int(rank.copy_trades_limit) if rank else 0
+        except (ValueError, AttributeError):
+            max_trades_allowed = 5  # Default limit
+    
+    if trades_last_24h >= max_trades_allowed:
+        messages.warning(request, f'Copy trade limit reached for the last 24 hours ({max_trades_allowed}/{max_trades_allowed}). Try again tomorrow.')
+        return redirect('crypto:dashboard')
+    
+    messages.info(request, f'Copy trades used: {trades_last_24h}/{max_trades_allowed} in last 24 hours')
+    
+    # Safety check: must have principal balance
+    if profile.principal_balance <= 0:
+        messages.warning(request, 'Insufficient balance to execute copy trades.')
+        return redirect('crypto:dashboard')
+    
+    pair = random.choice(PAIRS)
+    action = random.choice(['buy', 'sell'])
+    # Small lot size for copy trading (0.01 to 0.1); float math, quantized once
+    # to the field's 2 decimal places
+    amount = Decimal(f'{0.01 + 0.09 * random.random():.2f}')
+    
+    # Profit is filled in by tasks.update_pending_trades_profit() while the
+    # trade is pending, based on the rank's per-trade target.
+    # Create copy trade with initial status 'pending' (realistic delay)
+    trade = CopyTrade.objects.create(
+        user=request.user, 
+        pair=pair, 
+        action=action, 
+        amount=amount, 
+        profit=Decimal('0'),  # Start with 0 profit
+        status='pending'  # Pending status for realistic delay
+    )
+    _record_copy_trade(request.user)
+    
+    messages.success(request, f'Copy trade submitted: {pair} {action} — ${amount:.2f}. Processing...')
+    return redirect('crypto:dashboard')
+
+# =============================================================================
+# Finance
+# =============================================================================
+
+FINANCE_HISTORY_PAGE_SIZE = 20  # rows per page of deposit/withdrawal history
+
+# History label for Paystack deposits, e.g. 'Paystack NGN (₦16000.00)'
+_paystack_network_label = 'Paystack NGN (₦{:.2f})'.format
+
+# Attributes the finance template reads from the session's last_deposit
+_LAST_DEPOSIT_DEFAULTS = {
+    'amount': None,
+    'network': None,
+    'wallet_address': None,
+    'created_at': None,
+    'created_timestamp': None,
+    'deposit_id': None,
+    'deposit_type': 'crypto',
+    'paystack_reference': None,
+}
+
+def _finance_totals(user):
+    """Deposit/withdrawal/daily reward totals for the finance overview, cached per user.
+
+    The model signals in models.py drop the entry whenever one of the
+    underlying rows is saved or deleted.
+    """
+    def compute():
+        deposits = Deposit.objects.filter(user=user).aggregate(
+            approved=Sum('amount', filter=Q(status='approved')),
+            pending=Sum('amount', filter=Q(status='pending')),
+        )
+        local_deposits = LocalDeposit.objects.filter(user=user).aggregate(
+            paid=Sum('amount_usdt', filter=Q(status='paid')),
+            pending=Sum('amount_usdt', filter=Q(status='pending')),
+        )
+        withdrawn = Withdrawal.objects.filter(user=user, status='approved').aggregate(s=Sum('amount'))['s']
+        local_withdrawn = LocalWithdrawal.objects.filter(user=user, status='completed').aggregate(s=Sum('amount_usdt'))['s']
+        daily_sum = DailyReward.objects.filter(user=user).aggregate(s=Sum('amount'))['s']
+        zero = Decimal('0')
+        return {
+            'total_deposits': (deposits['approved'] or zero) + (local_deposits['paid'] or zero),
+            'pending_deposits': (deposits['pending'] or zero) + (local_deposits['pending'] or zero),
+            'total_withdrawals': (withdrawn or zero) + (local_withdrawn or zero),
+            'daily_rewards': daily_sum or zero,
+        }
+    
+    return cache.get_or_set(finance_overview_key(user.pk), compute, FINANCE_OVERVIEW_TTL)
+
+def _history_page(request):
+    try:
+        return max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        return 1
+
+def _finance_history(user, page):
+    """One page of the user's combined deposit and withdrawal history, newest first"""
+    deposits = Deposit.objects.filter(user=user).order_by('-created_at')
+    withdrawals = Withdrawal.objects.filter(user=user).order_by('-created_at')
+    
+    # Local deposits and withdrawals
+    local_deposits = LocalDeposit.objects.without_payload().filter(user=user).order_by('-created_at')
+    local_withdrawals = LocalWithdrawal.objects.without_payload().filter(user=user).order_by('-created_at')
+    
+    # Page N needs at most the newest N * page size rows of each source
+    # (plus one to know whether another page exists)
+    end = page * FINANCE_HISTORY_PAGE_SIZE
+    start = end - FINANCE_HISTORY_PAGE_SIZE
+    
+    # Combine all deposits into a single list sorted by date; rows come
+    # straight from the cursor as dicts instead of model instances
+    deposit_rows = list(deposits.values(
+        'id', 'amount', 'network', 'wallet_address', 'status', 'created_at', 'approved_at', 'referrer_id',
+    )[:end + 1])
+    local_deposit_rows = list(local_deposits.values(
+        'id', 'amount_usdt', 'amount_ngn', 'paystack_reference', 'status', 'created_at', 'paid_at', 'referrer_id',
+    )[:end + 1])
+    # Referrers for both lists in one query
+    referrers = User.objects.in_bulk(
+        {row['referrer_id'] for row in deposit_rows + local_deposit_rows if row['referrer_id']}
+    )
+    # Each source is already newest-first from the DB, so merge instead of sorting
+    crypto_deposits = ({
+        'pk': row['id'],
+        'id': row['id'],
+        'user': user,  # every row is the viewer's; skip the FK fetch
+        'amount': row['amount'],
+        'type': 'crypto',
+        'network': row['network'],
+        'wallet_address': row['wallet_address'],
+        'status': row['status'],
+        'created_at': row['created_at'],
+        'approved_at': row['approved_at'],
+        'referrer': referrers.get(row['referrer_id']),
+    } for row in deposit_rows)
+    paystack_deposits = ({
+        'pk': row['id'],
+        'id': row['id'],
+        'user': user,
+        'amount': row['amount_usdt'],
+        'type': 'paystack',
+        'network': _paystack_network_label(row['amount_ngn']),
+        'wallet_address': row['paystack_reference'],
+        'status': row['status'],
+        'created_at': row['created_at'],
+        'approved_at': row['paid_at'],
+        'referrer': referrers.get(row['referrer_id']),
+    } for row in local_deposit_rows)
+    all_deposits = list(heapq.merge(
+        crypto_deposits, paystack_deposits, key=lambda x: x['created_at'], reverse=True,
+    ))
+    has_next = len(all_deposits) > end
+    all_deposits = all_deposits[start:end]
+    
+    # Same for crypto and local withdrawals
+    withdrawal_rows = list(withdrawals[:end + 1])
+    local_withdrawal_rows = list(local_withdrawals[:end + 1])
+    crypto_withdrawals = ({
+        'pk': withdrawal.id,
+        'amount': withdrawal.amount,
+        'type': 'crypto',
+        'network': withdrawal.network,
+        'wallet_address': withdrawal.wallet_address,
+        'status': withdrawal.status,
+        'created_at': withdrawal.created_at,
+        'processed_at': withdrawal.processed_at,
+    } for withdrawal in withdrawal_rows)
+    bank_withdrawals = ({
+        'pk': withdrawal.id,
+        'amount': withdrawal.amount_usdt,
+        'type': 'local',
+        'network': f'{withdrawal.bank_name} ({withdrawal.account_number})',
+        'wallet_address': f'{withdrawal.account_holder_name}',
+        'status': withdrawal.status,
+        'created_at': withdrawal.created_at,
+        'processed_at': withdrawal.processed_at,
+    } for withdrawal in local_withdrawal_rows)
+    all_withdrawals = list(heapq.merge(
+        crypto_withdrawals, bank_withdrawals, key=lambda x: x['created_at'], reverse=True,
+    ))
+    has_next = has_next or len(all_withdrawals) > end
+    all_withdrawals = all_withdrawals[start:end]
+    # The per-source lists hold the model instances behind this page's rows only
+    on_page = {(row['type'], row['pk']) for row in all_withdrawals}
+    
+    return {
+        'all_deposits': all_deposits,  # Combined and sorted deposits
+        'all_withdrawals': all_withdrawals,  # Combined and sorted withdrawals
+        'withdrawals': [w for w in withdrawal_rows if ('crypto', w.pk) in on_page],
+        'local_withdrawals': [w for w in local_withdrawal_rows if ('local', w.pk) in on_page],
+        'history_page': page,
+        'history_has_previous': page > 1,
+        'history_has_next': has_next,
+    }
+
+@login_required(login_url='crypto:login')
+@require_GET
+def finance_history_api(request):
+    """Paged deposit/withdrawal history as JSON, for loading the history after first paint"""
+    if request.user.is_banned:
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+    history = _finance_history(request.user, _history_page(request))
+    deposits = [
+        {**{k: v for k, v in row.items() if k != 'user'}, 'referrer': row['referrer'] and row['referrer'].username}
+        for row in history['all_deposits']
+    ]
+    return JsonResponse({
+        'deposits': deposits,
+        'withdrawals': history['all_withdrawals'],
+        'page': history['history_page'],
+        'has_previous': history['history_has_previous'],
+        'has_next': history['history_has_next'],
+    })
+
+@login_required(login_url='crypto:login')
+def finance_view(request):
+    if request.user.is_banned:
+        return redirect('crypto:login')
+    
+    profile = getattr(request.user, 'profile', None)
+    
+    ref_bonus = profile.referral_earnings if profile else Decimal('0')
+    
+    # Forms
+    deposit_form = DepositForm(request.POST or None)
+    withdrawal_form = WithdrawalForm(request.POST or None)
+    local_deposit_form = LocalDepositForm(request.POST or None)
+    local_withdrawal_form = LocalWithdrawalForm(request.POST or None, user=request.user)
+    
+    last_deposit = request.session.get('last_deposit')
+    
+    # Check if deposit has expired (5 minutes)
+    if last_deposit:
+        try:
+            created_ts = last_deposit.get('created_timestamp')
+            created_at_str = last_deposit.get('created_at')
+            if created_ts is not None:
+                age = time.time() - created_ts
+            elif created_at_str:
+                # Legacy session entries only carry the ISO string
+                created_at = datetime.fromisoformat(created_at_str.replace('Z', '+00:00'))
+                age = (timezone.now() - created_at).total_seconds()
+            else:
+                age = 0
+            
+            if age >= 300:  # 5 minutes = 300 seconds
+                # Deposit expired, remove from session
+                del request.session['last_deposit']
+                last_deposit = None
+                messages.info(request, 'Your previous deposit wallet address has expired. Please create a new deposit.')
+        except (TypeError, ValueError, AttributeError):
+            # Invalid timestamp, remove the deposit
+            del request.session['last_deposit']
+            last_deposit = None
+    
+    # Convert session data to object-like structure for template
+    if last_deposit:
+        last_deposit = SimpleNamespace(**{**_LAST_DEPOSIT_DEFAULTS, **last_deposit})
+
+    if request.method == 'POST':
+        # Crypto deposit submission
+        if 'deposit' in request.POST and deposit_form.is_valid():
+            amt = deposit_form.cleaned_data['amount']
+            net = deposit_form.cleaned_data['network']
+            ref_code = (deposit_form.cleaned_data.get('referrer_code') or '').strip()
+            ref = None
+            if ref_code:
+                p = Profile.objects.filter(referral_code=ref_code).exclude(user=request.user).first()
+                if p:
+                    ref = p.user
+            
+            # Get available wallet with 5-minute assignment
+            wallet, time_remaining = get_available_wallet(net, request.user.id)
+            
+            if wallet is None:
+                # No wallet available, show waiting message
+                minutes = int(time_remaining // 60)
+                seconds = int(time_remaining % 60)
+                messages.warning(request, f'No wallet available. Please wait {minutes}m {seconds}s for a wallet to be released.')
+                return redirect('crypto:finance')
+            
+            deposit = Deposit.objects.create(
+                user=request.user,
+                amount=amt,
+                network=net,
+                wallet_address=wallet,
+                referrer=ref,
+                status='pending'
+            )
+            
+            # Store deposit info for modal
+            deposit_data = {
+                'amount': float(amt),
+                'network': net,
+                'wallet_address': wallet,
+                'created_at': timezone.now().isoformat(),
+                'created_timestamp': int(timezone.now().timestamp()),  # Add Unix timestamp
+                'expires_at': (timezone.now() + timedelta(minutes=5)).isoformat(),
+                'deposit_id': deposit.id  # Add deposit ID for status checking
+            }
+            request.session['last_deposit'] = deposit_data
+            
+            messages.success(request, f'Deposit request of ${amt} submitted. Send ${amt} to {wallet}.')
+            return redirect('crypto:finance')
+        
+        # Local deposit submission
+        elif 'local_deposit' in request.POST and local_deposit_form.is_valid():
+            amount_usdt = local_deposit_form.cleaned_data['amount_usdt']
+            conversion_rate = LOCAL_PAYMENT_CONVERSION_RATE
+            amount_ngn = amount_usdt * conversion_rate
+            
+            from crypto.paystack_service import PaystackService
+            
+            # Initialize Paystack transaction immediately (no timer needed)
+            callback_url = PAYSTACK_CALLBACK_URL
+            paystack_response = PaystackService.initialize_transaction(
+                amount=amount_ngn,
+                email=request.user.email,
+                callback_url=callback_url,
+                reference=f"DEP_{secrets.token_hex(6)}"
+            )
+            
+            if paystack_response.get('status'):
+                # Create deposit record with Paystack's final reference in a
+                # single INSERT
+                LocalDeposit.objects.create(
+                    user=request.user,
+                    amount_usdt=amount_usdt,
+                    amount_ngn=amount_ngn,
+                    conversion_rate=conversion_rate,
+                    paystack_reference=paystack_response['data']['reference'],
+                    paystack_access_code=paystack_response['data'].get('access_code'),
+                    paystack_response=paystack_response,
+                )
+                
+                # Redirect to Paystack immediately (no modal)
+                return redirect(paystack_response['data']['authorization_url'])
+            else:
+                messages.error(request, "Failed to initialize Paystack payment. Please try again.")
+                return redirect('crypto:finance')
+        
+        # Crypto withdrawal submission
+        elif 'withdrawal' in request.POST and withdrawal_form.is_valid():
+            amt = withdrawal_form.cleaned_data['amount']
+            net = withdrawal_form.cleaned_data['network']
+            wallet = withdrawal_form.cleaned_data.get('wallet_address', '')
+            with transaction.atomic():
+                # Balance check, debit and timestamp in one UPDATE, so concurrent
+                # withdrawals can't both spend the same funds
+                if not profile.debit_withdrawable(amt, last_withdrawal_at=timezone.now()):
+                    messages.error(request, 'Insufficient withdrawable balance.')
+                    return redirect('crypto:finance')
+                Withdrawal.objects.create(
+                    user=request.user,
+                    amount=amt,
+                    network=net,
+                    wallet_address=wallet,
+                    status='pending_admin_approval'
+                )
+            profile.update_rank()
+            messages.success(request, 'Withdrawal submitted. Admin approval required.')
+            return redirect('crypto:finance')
+        
+        # Local withdrawal submission
+        elif 'local_withdrawal' in request.POST and local_withdrawal_form.is_valid():
+            amount_usdt = local_withdrawal_form.cleaned_data['amount_usdt']
+            bank_name = local_withdrawal_form.cleaned_data['bank_name']
+            account_number = local_withdrawal_form.cleaned_data['account_number']
+            account_holder_name = local_withdrawal_form.cleaned_data['account_holder_name']
+            
+            conversion_rate = 1430  # ₦1430 = 1 USDT for withdrawals
+            amount_ngn = amount_usdt * conversion_rate
+            
+            with transaction.atomic():
+                # Deduct funds immediately; the check and debit are one UPDATE
+                if not profile.debit_withdrawable(amount_usdt):
+                    messages.error(request, "Insufficient balance")
+                    return redirect('crypto:finance')
+                
+                # Create withdrawal record
+                withdrawal = LocalWithdrawal.objects.create(
+                    user=request.user,
+                    amount_usdt=amount_usdt,
+                    amount_ngn=amount_ngn,
+                    conversion_rate=conversion_rate,
+                    bank_name=bank_name,
+                    account_number=account_number,
+                    account_holder_name=account_holder_name,
+                    status='pending_admin_approval'
+                )
+            
+            messages.success(request, f"Local withdrawal request of ${amount_usdt} submitted successfully. Awaiting admin approval.")
+            return redirect('crypto:finance')
+
+    ctx = {
+        'profile': profile,
+        'overview': {
+            **_finance_totals(request.user),
+            'referral_bonuses': ref_bonus,
+        },
+        # History is only built when the page is rendered, never for POSTs
+        **_finance_history(request.user, _history_page(request)),
+        'networks': NETWORKS,
+        'min_deposit': MIN_DEPOSIT,
+        'min_withdrawal': MIN_WITHDRAWAL,
+        'deposit_form': deposit_form,
+        'withdrawal_form': withdrawal_form,
+        'local_deposit_form': local_deposit_form,
+        'local_withdrawal_form': local_withdrawal_form,
+        'last_deposit': last_deposit,
+        'conversion_rate': LOCAL_PAYMENT_CONVERSION_RATE,
+    }
+    return render(request, 'crypto/finance.html', ctx)
+# =============================================================================
+
+@login_required(login_url='crypto:login')
+def profile_view(request):
+    if request.user.is_banned:
+        return redirect('crypto:login')
+    profile = _get_profile(request.user)
+    
+    if request.method == 'POST':
+        form = ProfileUpdateForm(request.POST, request.FILES, user=request.user, instance=profile)
+        
+        if form.is_valid():
+            form.save()
+            messages.success(request, 'Profile updated successfully!')
+            # Reload the profile to get updated data
+            profile.refresh_from_db()
+            # Create new form with updated instance
+            form = ProfileUpdateForm(user=request.user, instance=profile)
+    else:
+        form = ProfileUpdateForm(user=request.user, instance=profile)
+    
+    ctx = {'profile': profile, 'form': form, 'user': request.user}
+    return render(request, 'crypto/profile.html', ctx)
+
+# =============================================================================
+# Contact Us
+# =============================================================================
+
+def contact_view(request):
+    """Contact us page with links to support channels"""
+    return render(request, 'crypto/contact.html')
+
+# =============================================================================
+# Local Payments
+# =============================================================================
+
+@login_required(login_url='crypto:login')
+def local_deposit_view(request):
+    """Handle local deposit with Paystack"""
+    if request.user.is_banned:
+        return redirect('crypto:login')
+    
+    from crypto.paystack_service import PaystackService
+    
+    if request.method == 'POST':
+        form = LocalDepositForm(request.POST)
+        if form.is_valid():
+            amount_usdt = form.cleaned_data['amount_usdt']
+            conversion_rate = LOCAL_PAYMENT_CONVERSION_RATE
+            amount_ngn = amount_usdt * conversion_rate
+            
+            reference = f"DEP_{secrets.token_hex(6)}"
+            
+            # Initialize Paystack transaction
+            callback_url = PAYSTACK_CALLBACK_URL
+            paystack_response = PaystackService.initialize_transaction(
+                amount=amount_ngn,
+                email=request.user.email,
+                callback_url=callback_url,
+                reference=reference
+            )
+            
+            if paystack_response.get('status'):
+                # Create deposit record once Paystack has accepted it: one INSERT
+                # carries the response and access code, and failures leave no row
+                LocalDeposit.objects.create(
+                    user=request.user,
+                    amount_usdt=amount_usdt,
+                    amount_ngn=amount_ngn,
+                    conversion_rate=conversion_rate,
+                    paystack_reference=reference,
+                    paystack_access_code=paystack_response['data']['access_code'],
+                    paystack_response=paystack_response,
+                )
+                
+                # Redirect to Paystack payment page
+                authorization_url = paystack_response['data']['authorization_url']
+                return redirect(authorization_url)
+            else:
+                messages.error(request, f"Payment initialization failed: {paystack_response.get('message', 'Unknown error')}")
+    else:
+        form = LocalDepositForm()
+    
+    # Get user's recent deposits
+    recent_deposits = LocalDeposit.objects.without_payload().filter(user=request.user).order_by('-created_at')[:5]
+    
+    ctx = {
+        'form': form,
+        'recent_deposits': recent_deposits,
+        'conversion_rate': LOCAL_PAYMENT_CONVERSION_RATE,
+    }
+    return render(request, 'crypto/local_deposit.html', ctx)
+
+
+@login_required(login_url='crypto:login')
+def local_withdrawal_view(request):
+    """Handle local withdrawal with bank details"""
+    if request.user.is_banned:
+        return redirect('crypto:login')
+    
+    
+    if request.method == 'POST':
+        form = LocalWithdrawalForm(request.POST, user=request.user)
+        if form.is_valid():
+            amount_usdt = form.cleaned_data['amount_usdt']
+            bank_name = form.cleaned_data['bank_name']
+            account_number = form.cleaned_data['account_number']
+            account_holder_name = form.cleaned_data['account_holder_name']
+            
+            conversion_rate = 1430  # ₦1430 = 1 USDT for withdrawals
+            amount_ngn = amount_usdt * conversion_rate
+            
+            with transaction.atomic():
+                # Deduct funds immediately; the check and debit are one UPDATE
+                if not request.user.profile.debit_withdrawable(amount_usdt):
+                    messages.error(request, "Insufficient balance")
+                    return redirect('crypto:local_withdrawal')
+                
+                # Create withdrawal record
+                withdrawal = LocalWithdrawal.objects.create(
+                    user=request.user,
+                    amount_usdt=amount_usdt,
+                    amount_ngn=amount_ngn,
+                    conversion_rate=conversion_rate,
+                    bank_name=bank_name,
+                    account_number=account_number,
+                    account_holder_name=account_holder_name,
+                    status='pending_admin_approval'
+                )
+            
+            messages.success(request, f"Withdrawal request of ${amount_usdt} submitted successfully. Awaiting admin approval.")
+            return redirect('crypto:local_withdrawal')
+    else:
+        form = LocalWithdrawalForm(user=request.user)
+    
+    # Get user's recent withdrawals
+    recent_withdrawals = LocalWithdrawal.objects.without_payload().filter(user=request.user).order_by('-created_at')[:5]
+    
+    ctx = {
+        'form': form,
+        'recent_withdrawals': recent_withdrawals,
+        'conversion_rate': LOCAL_PAYMENT_CONVERSION_RATE,
+        'available_balance': request.user.profile.withdrawable_balance,
+    }
+    return render(request, 'crypto/local_withdrawal.html', ctx)
+
+
+# Webhook events that settle a row: (model, reference field, settled status,
+# timestamp field, amount field, rollup column)
+_PAYSTACK_SETTLEMENTS = {
+    'charge.success': (LocalDeposit, 'paystack_reference', 'paid', 'paid_at', 'amount_usdt', 'local_deposits'),
+    'transfer.success': (LocalWithdrawal, 'paystack_transfer_reference', 'completed', 'completed_at', 'amount_usdt', 'local_withdrawals'),
+}
+
+def _handle_paystack_settlement(event, handler, payload):
+    """Run a paystack_service webhook handler and add the row to the daily rollup if it settled it.
+
+    The row is locked around the handler, so comparing its status before
+    and after is an exact transition check: a retried webhook, or one that
+    lands after the redirect already verified the payment, records nothing.
+    """
+    model, ref_field, settled, stamp, amount_field, column = _PAYSTACK_SETTLEMENTS[event]
+    reference = payload.get('data', {}).get('reference')
+    with transaction.atomic():
+        row = (model.objects.select_for_update().filter(**{ref_field: reference})
+               .only('status', amount_field).first() if reference else None)
+        success, message = handler(payload)
+        if row and row.status != settled and model.objects.filter(pk=row.pk, status=settled).exists():
+            model.objects.filter(pk=row.pk, **{f'{stamp}__isnull': True}).update(**{stamp: timezone.now()})
+            DailyFinanceRollup.objects.record(**{column: getattr(row, amount_field)})
+    return success, message
+
+def _verify_and_credit(reference):
+    """Verify a Paystack reference and credit its deposit exactly once.
+
+    Returns (deposit, paid). Raises LocalDeposit.DoesNotExist for an
+    unknown reference.
+    """
+    from crypto.paystack_service import PaystackService
+    
+    deposit = LocalDeposit.objects.select_related('user__profile').get(paystack_reference=reference)
+    if deposit.status == 'paid':
+        # Redirect and verify page both land here; don't credit twice
+        return deposit, True
+    
+    # Verify transaction with Paystack (outside the transaction: network call)
+    verification_response = PaystackService.verify_transaction(reference)
+    paid = bool(verification_response.get('status')) and verification_response['data']['status'] == 'success'
+    
+    profile = deposit.user.profile
+    with transaction.atomic():
+        # Re-check under a row lock so concurrent callbacks serialize here
+        if LocalDeposit.objects.select_for_update().values_list('status', flat=True).get(pk=deposit.pk) == 'paid':
+            return deposit, True
+        deposit.status = 'paid' if paid else 'failed'
+        deposit.paystack_response = verification_response
+        update_fields = ['status', 'paystack_response']
+        if paid:
+            deposit.paid_at = timezone.now()
+            update_fields.append('paid_at')
+        deposit.save(update_fields=update_fields)
+        if paid:
+            # Add funds to user's locked balance
+            profile.adjust_balances(locked_delta=deposit.amount_usdt)
+            DailyFinanceRollup.objects.record(local_deposits=deposit.amount_usdt)
+    
+    if paid:
+        profile.update_rank()
+    return deposit, paid
+
+@csrf_exempt
+def paystack_callback_view(request):
+    """Handle Paystack webhook callbacks and redirects"""
+    if request.method == 'POST':
+        # Handle webhook (POST request)
+        from crypto.paystack_service import PaystackWebhookHandler
+        
+        try:
+            signature = request.headers.get('x-paystack-signature', '')
+            logger.debug("Paystack webhook received (signature %s)", 'present' if signature else 'missing')
+            
+            # Verify webhook signature on the raw body before parsing it, so
+            # forged requests never reach the JSON decoder
+            if not PaystackWebhookHandler.verify_webhook_signature(request.body, signature):
+                logger.warning("Paystack webhook signature verification failed")
+                return JsonResponse({'status': 'error', 'message': 'Invalid signature'}, status=401)
+            
+            # Log incoming webhook
+            payload = json.loads(request.body)
+            event = payload.get('event', '')
+            logger.debug("Paystack webhook event=%s ref=%s", event, payload.get('data', {}).get('reference'))
+            
+            if event == 'charge.success':
+                success, message = _handle_paystack_settlement(event, PaystackWebhookHandler.handle_charge_success, payload)
+                logger.debug("Paystack charge.success: %s - %s", success, message)
+                return JsonResponse({'status': 'success' if success else 'error', 'message': message})
+            
+            elif event == 'transfer.success':
+                success, message = _handle_paystack_settlement(event, PaystackWebhookHandler.handle_transfer_success, payload)
+                logger.debug("Paystack transfer.success: %s - %s", success, message)
+                return JsonResponse({'status': 'success' if success else 'error', 'message': message})
+            
+            elif event == 'transfer.failed':
+                success, message = PaystackWebhookHandler.handle_transfer_failed(payload)
+                logger.debug("Paystack transfer.failed: %s - %s", success, message)
+                return JsonResponse({'status': 'success' if success else 'error', 'message': message})
+            
+            else:
+                logger.debug("Unhandled Paystack webhook event: %s", event)
+                return JsonResponse({'status': 'success', 'message': f'Event {event} received'})
+                
+        except json.JSONDecodeError as e:
+            logger.warning("Paystack webhook body is not valid JSON: %s", e)
+            return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+        except Exception:
+            logger.exception("Paystack webhook processing error")
+            return JsonResponse({'status': 'error', 'message': 'Processing error'}, status=500)
+    
+    elif request.method == 'GET':
+        # Handle Paystack redirect after payment (GET request)
+        reference = request.GET.get('reference', '')
+        logger.debug("Paystack redirect received ref=%s", reference)
+        
+        if reference:
+            try:
+                deposit, paid = _verify_and_credit(reference)
+                
+                if paid:
+                    logger.debug("Paystack payment verified ref=%s credited=%s", reference, deposit.amount_usdt)
+                    
+                    # Redirect back to finance page with success message
+                    messages.success(request, f"Deposit of ${deposit.amount_usdt} confirmed and added to your account!")
+                    return redirect('crypto:finance')
+                else:
+                    logger.debug("Paystack payment verification failed ref=%s", reference)
+                    
+                    messages.error(request, "Payment verification failed. Please contact support.")
+                    return redirect('crypto:finance')
+                    
+            except LocalDeposit.DoesNotExist:
+                logger.debug("Unknown Paystack reference %s", reference)
+                messages.error(request, "Invalid payment reference")
+                return redirect('crypto:finance')
+            except Exception:
+                logger.exception("Error processing Paystack redirect ref=%s", reference)
+                messages.error(request, "Error processing payment verification")
+                return redirect('crypto:finance')
+        else:
+            logger.debug("Paystack redirect without a reference")
+            messages.error(request, "No payment reference provided")
+            return redirect('crypto:finance')
+    
+    else:
+        logger.debug("Paystack callback with unsupported method %s", request.method)
+        return JsonResponse({'status': 'error', 'message': 'Invalid request method'}, status=400)
+
+
+@login_required(login_url='crypto:login')
+def paystack_verify_view(request):
+    """Verify Paystack payment after redirect"""
+    reference = request.GET.get('reference', '')
+    if not reference:
+        messages.error(request, "No payment reference provided")
+        return redirect('crypto:local_deposit')
+    
+    try:
+        deposit, paid = _verify_and_credit(reference)
+        
+        if paid:
+            messages.success(request, f"Deposit of ${deposit.amount_usdt} confirmed and added to your account!")
+        else:
+            messages.error(request, "Payment verification failed. Please contact support.")
+    
+    except LocalDeposit.DoesNotExist:
+        messages.error(request, "Invalid payment reference")
+    
+    return redirect('crypto:local_deposit')
+
+# =============================================================================
+# Referral / Promos
+# =============================================================================
+
+PROMO_BONUS_STEPS = 10 ** 9
+
+@login_required(login_url='crypto:login')
+def referral_view(request):
+    if request.user.is_banned:
+        return redirect('crypto:login')
+    profile = _get_profile(request.user)
+    if request.method == 'POST':
+        # Read the one field directly; an over-long code simply matches no row
+        code = request.POST.get('code', '').strip()
+        promo = PromoCode.objects.filter(code=code, status='active').first() if code else None
+        if not promo:
+            messages.error(request, 'Invalid or expired promo code.')
+            return redirect('crypto:referral')
+        if promo.expiration and promo.expiration < timezone.now():
+            messages.error(request, 'Promo code expired.')
+            return redirect('crypto:referral')
+        # Unpredictable payout, drawn as an integer fraction so no float round-trips through str
+        fraction = Decimal(secrets.randbelow(PROMO_BONUS_STEPS + 1)) / PROMO_BONUS_STEPS
+        bonus = (promo.bonus_min + (promo.bonus_max - promo.bonus_min) * fraction).quantize(Decimal('0.01'))
+        try:
+            with transaction.atomic():
+                # The usage limit is enforced by the UPDATE itself, not a read-then-write
+                claimed = PromoCode.objects.filter(pk=promo.pk, status='active').filter(
+                    Q(usage_limit__isnull=True) | Q(usage_count__lt=F('usage_limit'))
+                ).update(usage_count=F('usage_count') + 1)
+                if not claimed:
+                    messages.error(request, 'Usage limit reached.')
+                    return redirect('crypto:referral')
+                
+                # unique_together(user, promo_code) rejects a second redemption
+                PromoRedemption.objects.create(user=request.user, promo_code=promo, bonus_amount=bonus)
+                
+                # Create deposit record for the promo bonus with 30-day expiration
+                expires_at = timezone.now() + timedelta(days=30)
+                Deposit.objects.create(
+                    user=request.user,
+                    amount=bonus,
+                    network='PROMO',
+                    wallet_address='PROMO_BONUS',
+                    status='approved',
+                    expires_at=expires_at,
+                    approved_at=timezone.now()
+                )
+                
+                # Add to locked balance (same as before)
+                profile.adjust_balances(locked_delta=bonus)
+                DailyFinanceRollup.objects.record(crypto_deposits=bonus)
+        except IntegrityError:
+            messages.error(request, 'Already redeemed.')
+            return redirect('crypto:referral')
+        
+        # Update rank after promo redemption
+        profile.update_rank()
+        messages.success(request, f'Promo redeemed. Bonus ${bonus:.2f} credited (expires in 30 days).')
+        return redirect('crypto:referral')
+    ctx = {'profile': profile, 'form': PromoRedeemForm()}
+    return render(request, 'crypto/referral.html', ctx)
+
+# =============================================================================
+# Admin
+# =============================================================================
+
+# --- Dashboard ---
+def _admin_dashboard_totals():
+    """Site-wide figures for the admin dashboard; cached, cleared on deposit/withdrawal writes"""
+    total_users = User.objects.filter(is_staff=False).count()
+    zero = Decimal('0')
+    
+    # Settled totals come from the per-day rollup; pending counts hit the status indexes
+    settled = DailyFinanceRollup.objects.aggregate(
+        crypto_deposits=Sum('crypto_deposits'),
+        local_deposits=Sum('local_deposits'),
+        crypto_withdrawals=Sum('crypto_withdrawals'),
+        local_withdrawals=Sum('local_withdrawals'),
+    )
+    balances = Profile.objects.aggregate(locked=Sum('locked_balance'), withdrawable=Sum('withdrawable_balance'))
+    
+    # Include both crypto and Paystack deposits
+    crypto_deposits = settled['crypto_deposits'] or zero
+    local_deposits = settled['local_deposits'] or zero
+    total_deposits = crypto_deposits + local_deposits
+    total_withdrawals = (settled['crypto_withdrawals'] or zero) + (settled['local_withdrawals'] or zero)
+    pending_deposits = (Deposit.objects.filter(status='pending').count()
+                        + LocalDeposit.objects.filter(status='pending').count())
+    pending_withdrawals = (Withdrawal.objects.filter(status='pending_admin_approval').count()
+                           + LocalWithdrawal.objects.filter(status='pending_admin_approval').count())
+    
+    # Calculate total user balances
+    total_locked_balance = balances['locked'] or zero
+    total_withdrawable_balance = balances['withdrawable'] or zero
+    
+    return {
+        'total_users': total_users,
+        'total_deposits': total_deposits,
+        'total_withdrawals': total_withdrawals,
+        'pending_deposits': pending_deposits,
+        'pending_withdrawals': pending_withdrawals,
+        'total_locked_balance': total_locked_balance,
+        'total_withdrawable_balance': total_withdrawable_balance,
+        'crypto_deposits': crypto_deposits,
+        'local_deposits': local_deposits,
+    }
+
+@login_required(login_url='crypto:login')
+@admin_required
+def admin_dashboard_view(request):
+    ctx = cache.get_or_set(ADMIN_DASHBOARD_KEY, _admin_dashboard_totals, ADMIN_DASHBOARD_TTL)
+    return render(request, 'crypto/admin/dashboard.html', ctx)
+
+# --- Deposits ---
+ADMIN_LIST_PAGE_SIZE = 50
+
+# Annotated columns shared by both sides of the admin deposits UNION
+_ADMIN_DEPOSIT_COLUMNS = ('kind', 'disp_amount', 'net', 'ref', 'ngn', 'done_at')
+
+@login_required(login_url='crypto:login')
+@admin_required
+def admin_deposits_view(request):
+    status = request.GET.get('status')
+    deposit_type = request.GET.get('type', 'all')
+    
+    # Both deposit kinds projected onto the same columns, so the database can
+    # UNION ALL them and do the ordering and paging itself
+    crypto_deposits = Deposit.objects.annotate(
+        kind=Value('crypto', output_field=CharField()),
+        disp_amount=F('amount'),
+        net=F('network'),
+        ref=F('wallet_address'),
+        ngn=Value(None, output_field=DecimalField(max_digits=18, decimal_places=2)),
+        done_at=F('approved_at'),
+    ).values('id', 'user_id', 'referrer_id', 'status', 'created_at', *_ADMIN_DEPOSIT_COLUMNS).order_by()
+    local_deposits = LocalDeposit.objects.annotate(
+        kind=Value('paystack', output_field=CharField()),
+        disp_amount=F('amount_usdt'),
+        net=Value('', output_field=CharField()),
+        ref=F('paystack_reference'),
+        ngn=F('amount_ngn'),
+        done_at=F('paid_at'),
+    ).values('id', 'user_id', 'referrer_id', 'status', 'created_at', *_ADMIN_DEPOSIT_COLUMNS).order_by()
+    
+    # Filter by status
+    if status:
+        if status == 'pending':
+            crypto_deposits = crypto_deposits.filter(status='pending')
+            local_deposits = local_deposits.filter(status='pending')
+        elif status == 'approved':
+            crypto_deposits = crypto_deposits.filter(status='approved')
+            local_deposits = local_deposits.filter(status='paid')
+        elif status == 'rejected':
+            crypto_deposits = crypto_deposits.filter(status='rejected')
+            local_deposits = local_deposits.filter(status='failed')
+    
+    # Filter by type
+    if deposit_type == 'crypto':
+        combined = crypto_deposits
+    elif deposit_type == 'paystack':
+        combined = local_deposits
+    else:
+        combined = crypto_deposits.union(local_deposits, all=True)
+    
+    page = Paginator(combined.order_by('-created_at'), ADMIN_LIST_PAGE_SIZE).get_page(request.GET.get('page'))
+    rows = list(page.object_list)
+    
+    # Users and referrers for the page in one keyed fetch
+    users = User.objects.in_bulk({row['user_id'] for row in rows} | {row['referrer_id'] for row in rows if row['referrer_id']})
+    all_deposits = [{
+        'pk': row['id'],  # Use 'pk' instead of 'id' for template compatibility
+        'id': row['id'],
+        'user': users.get(row['user_id']),
+        'amount': row['disp_amount'],
+        'type': row['kind'],
+        'network': row['net'] if row['kind'] == 'crypto' else _paystack_network_label(row['ngn']),
+        'wallet_address': row['ref'],
+        'status': row['status'],
+        'created_at': row['created_at'],
+        'approved_at': row['done_at'],
+        'referrer': users.get(row['referrer_id']),
+    } for row in rows]
+    
+    return render(request, 'crypto/admin/deposits.html', {'deposits': all_deposits, 'page_obj': page})
+
+_ADMIN_DEPOSIT_MODELS = {'crypto': Deposit, 'paystack': LocalDeposit}
+
+def _admin_deposit_kind(request, pk):
+    """Which table an approve/reject targets: the ``type`` ('crypto' or 'paystack') sent with it,
+    or, for forms that don't send one, whichever table holds ``pk`` (crypto first)"""
+    kind = request.POST.get('type') or request.GET.get('type')
+    if kind is None:
+        for kind, model in _ADMIN_DEPOSIT_MODELS.items():
+            if model.objects.filter(pk=pk).exists():
+                return kind
+        raise Http404
+    if kind not in _ADMIN_DEPOSIT_MODELS:
+        raise Http404
+    return kind
+
+def _admin_deposit_for_update(kind, pk):
+    """Lock one deposit row of the given kind"""
+    return get_object_or_404(_ADMIN_DEPOSIT_MODELS[kind].objects.select_for_update(), pk=pk)
+
+@login_required(login_url='crypto:login')
+@admin_required
+@require_POST
+def admin_deposit_approve_view(request, pk):
+    kind = _admin_deposit_kind(request, pk)
+    model = _ADMIN_DEPOSIT_MODELS[kind]
+    now = timezone.now()
+    if kind == 'crypto':
+        approval = {
+            'status': 'approved',
+            'approved_at': now,
+            'expires_at': Coalesce('expires_at', Value(add_days(now, LOCK_DAYS))),
+        }
+    else:
+        # 'paid' for consistency with the Paystack webhook
+        approval = {'status': 'paid', 'paid_at': now}
+    
+    with transaction.atomic():
+        # Only a pending row matches, so of two concurrent approvals just one gets a row
+        if not model.objects.filter(pk=pk, status='pending').update(**approval):
+            get_object_or_404(model, pk=pk)
+            messages.warning(request, f"{'Crypto' if kind == 'crypto' else 'Paystack'} deposit is not pending.")
+            return redirect('crypto:admin_deposits')
+        
+        if kind == 'crypto':
+            d = Deposit.objects.only('amount', 'user', 'referrer').get(pk=pk)
+            credit = d.amount
+            DailyFinanceRollup.objects.record(crypto_deposits=credit)
+            
+            # Referral bonus for crypto deposit
+            if d.referrer_id and d.referrer_id != d.user_id:
+                bonus = d.amount * REFERRAL_PCT
+                ref_profiles = Profile.objects.filter(user_id=d.referrer_id)
+                if ref_profiles.credit_referral(bonus):
+                    Referral.objects.create(referrer_id=d.referrer_id, referee_id=d.user_id, bonus_amount=bonus, deposit=d)
+                    ref_profiles.update_ranks()
+            
+            messages.success(request, f"Crypto deposit {d.amount} approved.")
+        
+        else:
+            d = LocalDeposit.objects.only('amount_usdt', 'user').get(pk=pk)
+            credit = d.amount_usdt
+            DailyFinanceRollup.objects.record(local_deposits=credit)
+            
+            # TODO: Implement referral logic for Paystack deposits if needed
+            # For now, skip referral processing to avoid AttributeError
+            
+            messages.success(request, f"Paystack deposit {d.amount_usdt} approved.")
+        
+        # Credit the deposit and update user rank without loading the profile
+        profiles = Profile.objects.filter(user_id=d.user_id)
+        if not profiles.adjust_balances(locked_delta=credit):
+            raise Http404
+        profiles.update_ranks()
+    
+    # The status UPDATE bypasses post_save, so clear what those receivers would have
+    cache.delete(ADMIN_DASHBOARD_KEY)
+    cache.delete(finance_overview_key(d.user_id))
+    return redirect('crypto:admin_deposits')
+
+@login_required(login_url='crypto:login')
+@admin_required
+@require_POST
+def admin_deposit_reject_view(request, pk):
+    kind = _admin_deposit_kind(request, pk)
+    with transaction.atomic():
+        d = _admin_deposit_for_update(kind, pk)
+        # Check if deposit can be rejected
+        if kind == 'crypto' and d.status != 'pending':
+            messages.warning(request, "Crypto deposit is not pending.")
+            return redirect('crypto:admin_deposits')
+        elif kind == 'paystack' and d.status != 'pending':
+            messages.warning(request, "Paystack deposit is not pending.")
+            return redirect('crypto:admin_deposits')
+    
+        if kind == 'crypto':
+            # Handle crypto deposit rejection
+            d.status = 'rejected'
+            d.approved_at = timezone.now()  # Use approved_at field for processing timestamp
+            d.save(update_fields=['status', 'approved_at'])
+            messages.success(request, f"Crypto deposit {d.amount} rejected.")
+        
+        else:
+            # Handle Paystack deposit rejection
+            d.status = 'failed'
+            d.save(update_fields=['status'])
+            messages.success(request, f"Paystack deposit {d.amount_usdt} rejected.")
+    
+    return redirect('crypto:admin_deposits')
+
+# --- Withdrawals ---
+@login_required(login_url='crypto:login')
+@admin_required
+def admin_withdrawals_view(request):
+    status = request.GET.get('status')
+    qs = Withdrawal.objects.select_related('user').order_by('-created_at')
+    if status:
+        qs = qs.filter(status=status)
+    return render(request, 'crypto/admin/withdrawals.html', {'withdrawals': qs})
+
+@login_required(login_url='crypto:login')
+@admin_required
+@require_POST
+def admin_withdrawal_approve_view(request, pk):
+    with transaction.atomic():
+        w = get_object_or_404(Withdrawal.objects.select_for_update(), pk=pk)
+        if w.status not in ['pending', 'pending_admin_approval']:
+            messages.warning(request, "Withdrawal is not pending.")
+            return redirect('crypto:admin_withdrawals')
+        w.status = 'approved'
+        w.processed_at = timezone.now()
+        w.save(update_fields=['status', 'processed_at'])
+        DailyFinanceRollup.objects.record(crypto_withdrawals=w.amount)
+    messages.success(request, f"Withdrawal {w.amount} approved.")
+    return redirect('crypto:admin_withdrawals')
+
+@login_required(login_url='crypto:login')
+@admin_required
+@require_POST
+def admin_withdrawal_reject_view(request, pk):
+    with transaction.atomic():
+        # Lock the row so a double-submitted reject can't refund twice
+        w = get_object_or_404(Withdrawal.objects.select_for_update(), pk=pk)
+        if w.status not in ['pending', 'pending_admin_approval']:
+            messages.warning(request, "Withdrawal is not pending.")
+            return redirect('crypto:admin_withdrawals')
+        
+        # Refund the amount back to user's withdrawable balance
+        Profile.objects.credit_withdrawable({w.user_id: w.amount})
+        
+        w.status = 'rejected'
+        w.processed_at = timezone.now()
+        w.save(update_fields=['status', 'processed_at'])
+    
+    messages.success(request, f"Withdrawal {w.amount} rejected and refunded.")
+    return redirect('crypto:admin_withdrawals')
+
+# --- Local Withdrawals ---
+@login_required(login_url='crypto:login')
+@admin_required
+def admin_local_withdrawals_view(request):
+    """Admin view to manage local withdrawal requests"""
+    status = request.GET.get('status')
+    qs = LocalWithdrawal.objects.without_payload().select_related('user').order_by('-created_at')
+    if status:
+        qs = qs.filter(status=status)
+    return render(request, 'crypto/admin/local_withdrawals.html', {'withdrawals': qs})
+
+@login_required(login_url='crypto:login')
+@admin_required
+@require_POST
+def admin_local_withdrawal_approve_view(request, pk):
+    """Approve a local withdrawal and process via Paystack"""
+    from crypto.paystack_service import PaystackService
+    w = get_object_or_404(LocalWithdrawal, pk=pk)
+    if w.status != 'pending_admin_approval':
+        messages.warning(request, "Local withdrawal is not pending.")
+        return redirect('crypto:admin_local_withdrawals')
+    
+    # Change status to approved first
+    w.status = 'approved'
+    w.processed_at = timezone.now()
+    w.processed_by = request.user
+    w.save(update_fields=['status', 'processed_at', 'processed_by'])
+    
+    # Process Paystack transfer automatically
+    try:
+        # Create transfer recipient
+        recipient_response = PaystackService.create_transfer_recipient(
+            account_number=w.account_number,
+            bank_code=w.get_bank_code(),  # We'll need to add this method
+            account_name=w.account_holder_name,
+            description=f"Withdrawal for {w.user.email}"
+        )
+        
+        if recipient_response.get('status'):
+            recipient_code = recipient_response['data']['recipient_code']
+            
+            # Initiate transfer
+            transfer_response = PaystackService.initiate_transfer(
+                amount=float(w.amount_ngn),
+                recipient_code=recipient_code,
+                reason=f"CopyBloom FX Withdrawal - {w.user.email}"
+            )
+            
+            if transfer_response.get('status'):
+                w.paystack_transfer_reference = transfer_response['data']['reference']
+                w.paystack_response = transfer_response
+                w.save(update_fields=['paystack_transfer_reference', 'paystack_response'])
+                
+                messages.success(request, f"Local withdrawal of ${w.amount_usdt} approved and Paystack transfer initiated. Reference: {transfer_response['data']['reference']}")
+            else:
+                messages.error(request, f"Failed to initiate Paystack transfer: {transfer_response.get('message', 'Unknown error')}")
+        else:
+            messages.error(request, f"Failed to create Paystack recipient: {recipient_response.get('message', 'Unknown error')}")
+            
+    except Exception as e:
+        messages.error(request, f"Error processing Paystack transfer: {str(e)}")
+    
+    return redirect('crypto:admin_local_withdrawals')
+
+@login_required(login_url='crypto:login')
+@admin_required
+@require_POST
+def admin_local_withdrawal_reject_view(request, pk):
+    """Reject a local withdrawal and refund user balance"""
+    with transaction.atomic():
+        w = get_object_or_404(LocalWithdrawal.objects.without_payload().select_for_update(), pk=pk)
+        if w.status != 'pending_admin_approval':
+            messages.warning(request, "Local withdrawal is not pending.")
+            return redirect('crypto:admin_local_withdrawals')
+        
+        # Refund the amount back to user's withdrawable balance
+        Profile.objects.credit_withdrawable({w.user_id: w.amount_usdt})
+        
+        # Update withdrawal status
+        w.status = 'rejected'
+        w.processed_at = timezone.now()
+        w.save(update_fields=['status', 'processed_at'])
+    
+    messages.success(request, f"Local withdrawal of ${w.amount_usdt} rejected and refunded.")
+    return redirect('crypto:admin_local_withdrawals')
+
+@login_required(login_url='crypto:login')
+@admin_required
+@require_POST
+def admin_local_withdrawal_complete_view(request, pk):
+    """Mark a local withdrawal as completed after Paystack processing"""
+    with transaction.atomic():
+        w = get_object_or_404(LocalWithdrawal.objects.without_payload().select_for_update(), pk=pk)
+        if w.status != 'approved':
+            messages.warning(request, "Local withdrawal must be approved first.")
+            return redirect('crypto:admin_local_withdrawals')
+        
+        # Mark as completed
+        w.status = 'completed'
+        w.completed_at = timezone.now()
+        w.save(update_fields=['status', 'completed_at'])
+        DailyFinanceRollup.objects.record(local_withdrawals=w.amount_usdt)
+    
+    messages.success(request, f"Local withdrawal of ${w.amount_usdt} marked as completed.")
+    return redirect('crypto:admin_local_withdrawals')
+
+# --- Users ---
+@login_required(login_url='crypto:login')
+@admin_required
+def admin_users_view(request):
+    flt = request.GET.get('filter')
+    qs = User.objects.filter(is_staff=False)
+    # Filter before paging so flagged/banned users past the first page aren't missed
+    if flt == 'flagged':
+        qs = qs.filter(is_flagged=True)
+    elif flt == 'banned':
+        qs = qs.filter(is_banned=True)
+    page = Paginator(qs.select_related('profile__rank').order_by('-id'), ADMIN_LIST_PAGE_SIZE).get_page(request.GET.get('page'))
+    return render(request, 'crypto/admin/users.html', {'users': page, 'page_obj': page})
+
+@login_required(login_url='crypto:login')
+@admin_required
+@require_POST
+def admin_user_flag_view(request, pk):
+    u = get_object_or_404(User, pk=pk)
+    if u.is_staff:
+        messages.error(request, "Cannot flag admin.")
+        return redirect('crypto:admin_users')
+    u.is_flagged = True
+    u.save(update_fields=['is_flagged'])
+    messages.success(request, "User flagged.")
+    return redirect('crypto:admin_users')
+
+@login_required(login_url='crypto:login')
+@admin_required
+@require_POST
+def admin_user_unflag_view(request, pk):
+    u = get_object_or_404(User, pk=pk)
+    u.is_flagged = False
+    u.save(update_fields=['is_flagged'])
+    messages.success(request, "User unflagged.")
+    return redirect('crypto:admin_users')
+
+@login_required(login_url='crypto:login')
+@admin_required
+@require_POST
+def admin_user_ban_view(request, pk):
+    u = get_object_or_404(User, pk=pk)
+    if u.is_staff:
+        messages.error(request, "Cannot ban admin.")
+        return redirect('crypto:admin_users')
+    u.is_banned = True
+    u.is_flagged = True
+    u.save(update_fields=['is_banned', 'is_flagged'])
+    messages.success(request, "User banned.")
+    return redirect('crypto:admin_users')
+
+@login_required(login_url='crypto:login')
+@admin_required
+@require_POST
+def admin_user_unban_view(request, pk):
+    u = get_object_or_404(User, pk=pk)
+    u.is_banned = False
+    u.save(update_fields=['is_banned'])
+    messages.success(request, "User unbanned.")
+    return redirect('crypto:admin_users')
+
+# --- Promo codes ---
+@login_required(login_url='crypto:login')
+@admin_required
+def admin_promos_view(request):
+    promos = PromoCode.objects.order_by('-created_at')
+    redemptions = PromoRedemption.objects.select_related('user', 'promo_code').order_by('-created_at')[:100]
+    form = PromoCodeCreateForm(request.POST or None)
+    if request.method == 'POST' and form.is_valid():
+        form.save()
+        messages.success(request, "Promo created.")
+        return redirect('crypto:admin_promos')
+    return render(request, 'crypto/admin/promos.html', {'promos': promos, 'redemptions': redemptions, 'form': form})
+
+@login_required(login_url='crypto:login')
+@admin_required
+@require_POST
+def admin_promo_toggle_view(request, pk):
+    p = get_object_or_404(PromoCode, pk=pk)
+    p.status = 'disabled' if p.status == 'active' else 'active'
+    p.save(update_fields=['status'])
+    messages.success(request, f"Promo {p.status}.")
+    return redirect('crypto:admin_promos')